@@ -10,10 +10,14 @@ Created on Tue Sep  9 22:00:48 2025
 # ==================================================
 
 import streamlit as st
-import pandas as pd
 import pynarrative as pn
 import openpyxl
 
+from upload_loader import ingest
+
+# Columnas que usan las historias (se agregan por Year mientras se lee)
+STORY_COLUMNS = ["Sales", "Profit", "Customers"]
+
 st.set_page_config(page_title="Storytelling Retail", layout="wide")
 
 # ===========================
@@ -24,14 +28,13 @@ st.title("📊 Storytelling de Retail con PyNarrative")
 uploaded_file = st.file_uploader("📂 Sube tu archivo Excel o CSV", type=["csv", "xlsx"])
 
 if uploaded_file:
-    # Leer datos
-    if uploaded_file.name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+    # Leer datos por bloques: la vista previa sale del primer bloque y las
+    # historias usan los totales por año, sin guardar todas las filas
+    preview = st.empty()
+    data = ingest(uploaded_file, group_by="Year", values=STORY_COLUMNS, keep_rows=False,
+                  usecols=["Year"] + STORY_COLUMNS, on_preview=preview.dataframe)
 
     st.success("✅ Archivo cargado correctamente")
-    st.dataframe(df.head())
 
     # ===========================
     # 2. Selección de historia
@@ -45,9 +48,10 @@ if uploaded_file:
     # 3. Crear historias
     # ===========================
 
-    if "Year" not in df.columns:
+    if "Year" not in data.columns:
         st.error("⚠️ Tu archivo debe tener una columna 'Year'.")
     else:
+        df = data.aggregates
         if opcion == "📈 Ventas":
             story = (
                 pn.Story(df, width=700, height=400)
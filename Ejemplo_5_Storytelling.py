@@ -5,34 +5,40 @@ Created on Tue Sep  9 23:50:53 2025
 @author: cesar
 """
 
-import altair as alt
 import pandas as pd
 import streamlit as st
-import plotly
-import plotly.express as px
-import plotly.graph_objects as go
-
-# Dataset de ejemplo
-df = px.data.gapminder().query("year == 2007")
-
-fig = px.scatter(df, x="gdpPercap", y="lifeExp", size="pop", color="continent",
-                 hover_name="country", log_x=True, size_max=60,color_discrete_sequence=px.colors.qualitative.Dark24)
-
-# Agregar anotación elegante
-fig.add_annotation(
-    x=30000, y=80,
-    text="Países con alto PIB y esperanza de vida",
-    showarrow=True,
-    arrowhead=1,
-    ax=-40,
-    ay=-40,
-    font=dict(size=14, color="blue"),
-    bgcolor="white",
-    bordercolor="blue",
-    borderwidth=1
-)
 
-st.plotly_chart(fig, use_container_width=True)
+from lazy_imports import lazy_import
+
+# Altair y Plotly se cargan al dibujar el primer gráfico que los usa
+alt = lazy_import("altair")
+px = lazy_import("plotly.express")
+
+# Dataset de ejemplo y figura: se construyen (y se importa plotly) al
+# dibujar el gráfico, una sola vez por proceso
+@st.cache_data
+def gapminder_figure():
+    df = px.data.gapminder().query("year == 2007")
+
+    fig = px.scatter(df, x="gdpPercap", y="lifeExp", size="pop", color="continent",
+                     hover_name="country", log_x=True, size_max=60,color_discrete_sequence=px.colors.qualitative.Dark24)
+
+    # Agregar anotación elegante
+    fig.add_annotation(
+        x=30000, y=80,
+        text="Países con alto PIB y esperanza de vida",
+        showarrow=True,
+        arrowhead=1,
+        ax=-40,
+        ay=-40,
+        font=dict(size=14, color="blue"),
+        bgcolor="white",
+        bordercolor="blue",
+        borderwidth=1
+    )
+    return fig
+
+st.plotly_chart(gapminder_figure(), use_container_width=True)
 
 
 
@@ -9,19 +9,34 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
+import perf_trace
+from chart_prep import COUNT_COLUMN, downsample, prepare
+from excel_loader import sheet_names
+from perf_trace import stage
+from upload_loader import MemoryLimitExceeded, cached_ingest
+
 # ======================
 # 1. Cargar archivo Excel
 # ======================
 st.title("📊 Storytelling Dashboard con Altair + Excel")
+perf_trace.begin_run("ejemplo_7")
 
 st.sidebar.header("Configuración")
 uploaded_file = st.sidebar.file_uploader("📂 Sube tu archivo Excel", type=["xlsx", "xls"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-
+    # Lectura por bloques con techo de memoria; la vista previa sale del primer bloque.
+    # El resultado queda en caché por contenido: cambiar un filtro no vuelve a leer el Excel
     st.write("### Vista previa de los datos")
-    st.dataframe(df.head())
+    sheets = sheet_names(uploaded_file) if uploaded_file.name.endswith(".xlsx") else [0]
+    sheet = st.sidebar.selectbox("Hoja", sheets) if len(sheets) > 1 else sheets[0]
+    preview = st.empty()
+    try:
+        with stage("carga", "excel"):
+            df = cached_ingest(uploaded_file, sheet_name=sheet, on_preview=preview.dataframe).frame
+    except MemoryLimitExceeded as e:
+        st.error(f"⚠️ {e}")
+        st.stop()
 
     # ======================
     # 2. Seleccionar columnas
@@ -30,74 +45,98 @@ if uploaded_file:
     col_x = st.sidebar.selectbox("Columna para eje X", df.columns)
     col_y = st.sidebar.selectbox("Columna para eje Y", df.columns)
 
+    # Agregación en el servidor: barras, sectores y líneas dibujan la suma de Y
+    # por cada valor de X, así el spec solo lleva una fila por marca
+    with stage("agregado", "sumas"):
+        sums, sums_note = prepare(df, col_x, col_y)
+    if sums_note:
+        st.warning(f"⚠️ {sums_note}")
+
     # ======================
     # 3. Gráfico de Barras
     # ======================
     st.subheader("📊 Gráfico de Barras con anotación")
-    bar_chart = alt.Chart(df).mark_bar(color="steelblue").encode(
+    bar_chart = alt.Chart(sums).mark_bar(color="steelblue").encode(
         x=alt.X(f"{col_x}:O", title=col_x),
         y=alt.Y(f"{col_y}:Q", title=col_y),
         tooltip=[col_x, col_y]
     ).properties(width=600, height=400)
 
     # anotación automática: valor máximo
-    max_row = df.loc[df[col_y].idxmax()]
+    max_row = sums.loc[sums[col_y].idxmax()]
     anot_bar = alt.Chart(pd.DataFrame({
         col_x: [max_row[col_x]],
         col_y: [max_row[col_y]],
         "label": ["Máximo valor"]
     })).mark_text(dy=-10, color="red").encode(x=f"{col_x}:O", y=f"{col_y}:Q", text="label")
 
-    st.altair_chart(bar_chart + anot_bar, use_container_width=True)
+    with stage("serializacion", "barras"):
+        st.altair_chart(bar_chart + anot_bar, use_container_width=True)
 
     # ======================
     # 4. Gráfico de Sectores
     # ======================
     st.subheader("🥧 Gráfico de Sectores (Pie Chart)")
-    pie_chart = alt.Chart(df).mark_arc().encode(
+    pie_chart = alt.Chart(sums).mark_arc().encode(
         theta=alt.Theta(f"{col_y}:Q", stack=True),
         color=alt.Color(f"{col_x}:N", legend=alt.Legend(title=col_x)),
         tooltip=[col_x, col_y]
     ).properties(width=400, height=400)
 
-    st.altair_chart(pie_chart, use_container_width=True)
+    with stage("serializacion", "sectores"):
+        st.altair_chart(pie_chart, use_container_width=True)
 
     # ======================
     # 5. Gráfico de Líneas
     # ======================
     st.subheader("📈 Serie de Tiempo con anotación")
-    line_chart = alt.Chart(df).mark_line(point=True).encode(
+    # Serie reducida a un punto por píxel (LTTB); conserva inicio, final y extremos
+    with stage("agregado", "lttb"):
+        line_data = downsample(sums, col_x, col_y)
+    line_chart = alt.Chart(line_data).mark_line(point=True).encode(
         x=alt.X(f"{col_x}:O", title=col_x),
         y=alt.Y(f"{col_y}:Q", title=col_y),
         tooltip=[col_x, col_y]
     ).properties(width=600, height=400)
 
     # anotación: primer y último punto
-    start_point = alt.Chart(df.head(1)).mark_text(dy=-10, color="green").encode(
+    start_point = alt.Chart(line_data.head(1)).mark_text(dy=-10, color="green").encode(
         x=f"{col_x}:O", y=f"{col_y}:Q", text=alt.value("Inicio")
     )
-    end_point = alt.Chart(df.tail(1)).mark_text(dy=-10, color="blue").encode(
+    end_point = alt.Chart(line_data.tail(1)).mark_text(dy=-10, color="blue").encode(
         x=f"{col_x}:O", y=f"{col_y}:Q", text=alt.value("Final")
     )
 
-    st.altair_chart(line_chart + start_point + end_point, use_container_width=True)
+    with stage("serializacion", "lineas"):
+        st.altair_chart(line_chart + start_point + end_point, use_container_width=True)
 
     # ======================
     # 6. Gráfico de Dispersión
     # ======================
     st.subheader("🔀 Gráfico de Dispersión (X vs Y)")
-    scatter_chart = alt.Chart(df).mark_circle(size=80).encode(
+    # Con muchos puntos se agrupan en celdas y el tamaño indica cuántos registros hay
+    with stage("agregado", "dispersion"):
+        points, points_note = prepare(df, col_x, col_y, kind="scatter")
+    if points_note:
+        st.warning(f"⚠️ {points_note}")
+    scatter_chart = alt.Chart(points).mark_circle(size=80).encode(
         x=alt.X(f"{col_x}:Q", title=col_x),
         y=alt.Y(f"{col_y}:Q", title=col_y),
-        tooltip=[col_x, col_y],
+        tooltip=list(points.columns),
         color=alt.Color(f"{col_x}:N")
     ).properties(width=600, height=400)
+    if COUNT_COLUMN in points.columns:
+        scatter_chart = scatter_chart.encode(size=alt.Size(f"{COUNT_COLUMN}:Q"))
 
-    st.altair_chart(scatter_chart, use_container_width=True)
+    with stage("serializacion", "dispersion"):
+        st.altair_chart(scatter_chart, use_container_width=True)
 
 else:
     st.info("📂 Sube un archivo Excel en la barra lateral para comenzar.")
 
+perf_trace.end_run()
+perf_trace.debug_panel()
+
 
 
 
@@ -9,10 +9,18 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
+import perf_trace
+from chart_prep import prepare
+from excel_loader import sheet_names
+from filter_plan import FilterPlan, extremes
+from perf_trace import stage
+from upload_loader import MemoryLimitExceeded, cached_ingest
+
 # ======================
 # 1. Configuración inicial
 # ======================
 st.set_page_config(page_title="📊 Storytelling Dashboard", layout="wide")
+perf_trace.begin_run("ejemplo_8")
 
 st.title("📊 Storytelling Dashboard con Altair + Excel")
 st.markdown("Sube tu archivo de Excel y genera gráficos interactivos con anotaciones.")
@@ -23,10 +31,18 @@ st.markdown("Sube tu archivo de Excel y genera gráficos interactivos con anotac
 uploaded_file = st.sidebar.file_uploader("📂 Sube tu archivo Excel", type=["xlsx", "xls"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-
+    # Lectura por bloques con techo de memoria; la vista previa sale del primer bloque.
+    # El resultado queda en caché por contenido: cambiar un filtro no vuelve a leer el Excel
     st.write("### Vista previa de los datos")
-    st.dataframe(df.head())
+    sheets = sheet_names(uploaded_file) if uploaded_file.name.endswith(".xlsx") else [0]
+    sheet = st.sidebar.selectbox("Hoja", sheets) if len(sheets) > 1 else sheets[0]
+    preview = st.empty()
+    try:
+        with stage("carga", "excel"):
+            df = cached_ingest(uploaded_file, sheet_name=sheet, on_preview=preview.dataframe).frame
+    except MemoryLimitExceeded as e:
+        st.error(f"⚠️ {e}")
+        st.stop()
 
     # ======================
     # 3. Selección de columnas
@@ -43,7 +59,9 @@ if uploaded_file:
     # ======================
     # 4. Filtros interactivos
     # ======================
+    # Todos los filtros se combinan en una máscara; solo se copian las filas del Top N
     st.sidebar.header("🔍 Filtros")
+    plan = FilterPlan(df)
 
     # Filtro por categoría
     if cat_cols:
@@ -51,19 +69,21 @@ if uploaded_file:
         if cat_filter != "Ninguno":
             options = df[cat_filter].unique().tolist()
             selected_opts = st.sidebar.multiselect(f"Selecciona {cat_filter}", options, default=options[:3])
-            df = df[df[cat_filter].isin(selected_opts)]
+            plan.isin(cat_filter, selected_opts)
 
     # Filtro por fecha
     if date_cols:
         date_filter = st.sidebar.selectbox("Columna de fecha", ["Ninguno"] + date_cols)
         if date_filter != "Ninguno":
-            min_date, max_date = df[date_filter].min(), df[date_filter].max()
+            dates = plan.column(date_filter)
+            min_date, max_date = dates.min(), dates.max()
             start, end = st.sidebar.date_input("Rango de fechas", [min_date, max_date])
-            df = df[(df[date_filter] >= pd.to_datetime(start)) & (df[date_filter] <= pd.to_datetime(end))]
+            plan.between(date_filter, pd.to_datetime(start), pd.to_datetime(end))
 
-    # Top N
+    # Top N (selección parcial, sin ordenar todo el archivo)
     top_n = st.sidebar.slider("Top N registros (por Y)", min_value=5, max_value=50, value=10)
-    df = df.sort_values(by=col_y, ascending=False).head(top_n)
+    with stage("transformacion", "filtros_top_n"):
+        df = plan.top_n(col_y, top_n)
 
     # ======================
     # 5. Paleta de colores
@@ -73,8 +93,16 @@ if uploaded_file:
     # ======================
     # 6. Gráficos con storytelling
     # ======================
+    # Agregación en el servidor: solo X y la suma de Y por cada X viajan en el spec
+    with stage("agregado", "sumas"):
+        sums, sums_note = prepare(df, col_x, col_y)
+        # Mínimo y máximo para las anotaciones, calculados una sola vez
+        min_row, max_row = extremes(sums, col_y)
+    if sums_note:
+        st.warning(f"⚠️ {sums_note}")
+
     st.subheader("📊 Gráfico de Barras")
-    bar_chart = alt.Chart(df).mark_bar().encode(
+    bar_chart = alt.Chart(sums).mark_bar().encode(
         x=alt.X(f"{col_x}:O", sort="-y"),
         y=alt.Y(f"{col_y}:Q"),
         color=alt.Color(f"{col_x}:N", scale=alt.Scale(scheme=color_scheme)),
@@ -82,7 +110,6 @@ if uploaded_file:
     ).properties(width=600, height=400)
 
     # anotación máximo
-    max_row = df.loc[df[col_y].idxmax()]
     anot_bar = alt.Chart(pd.DataFrame({
         col_x: [max_row[col_x]],
         col_y: [max_row[col_y]],
@@ -91,20 +118,24 @@ if uploaded_file:
         x=f"{col_x}:O", y=f"{col_y}:Q", text="label"
     )
 
-    st.altair_chart(bar_chart + anot_bar, use_container_width=True)
+    with stage("serializacion", "barras"):
+        st.altair_chart(bar_chart + anot_bar, use_container_width=True)
 
     # ======================
     st.subheader("🥧 Gráfico de Sectores (Pie)")
-    pie_chart = alt.Chart(df).mark_arc().encode(
+    pie_chart = alt.Chart(sums).mark_arc().encode(
         theta=alt.Theta(f"{col_y}:Q"),
         color=alt.Color(f"{col_x}:N", scale=alt.Scale(scheme=color_scheme)),
         tooltip=[col_x, col_y]
     ).properties(width=400, height=400)
-    st.altair_chart(pie_chart, use_container_width=True)
+    with stage("serializacion", "sectores"):
+        st.altair_chart(pie_chart, use_container_width=True)
 
     # ======================
     st.subheader("📈 Gráfico de Líneas (Time series)")
-    line_chart = alt.Chart(df).mark_line(point=True).encode(
+    # Top N deja a lo sumo 50 filas: la serie y la dispersión van completas
+    # (sin LTTB ni celdas, que en Ejemplo_7 sí aplican sobre todo el archivo)
+    line_chart = alt.Chart(sums).mark_line(point=True).encode(
         x=alt.X(f"{col_x}:O"),
         y=alt.Y(f"{col_y}:Q", scale=alt.Scale(zero=False)),
         tooltip=[col_x, col_y],
@@ -112,32 +143,37 @@ if uploaded_file:
     ).properties(width=600, height=400)
 
     # Anotar mínimo y máximo
-    min_row = df.loc[df[col_y].idxmin()]
-    end_row = df.loc[df[col_y].idxmax()]
     anot_line = alt.Chart(pd.DataFrame({
-        col_x: [min_row[col_x], end_row[col_x]],
-        col_y: [min_row[col_y], end_row[col_y]],
+        col_x: [min_row[col_x], max_row[col_x]],
+        col_y: [min_row[col_y], max_row[col_y]],
         "label": ["⬇ Mínimo", "⬆ Máximo"]
     })).mark_text(dy=-10, color="red").encode(
         x=f"{col_x}:O", y=f"{col_y}:Q", text="label"
     )
 
-    st.altair_chart(line_chart + anot_line, use_container_width=True)
+    with stage("serializacion", "lineas"):
+        st.altair_chart(line_chart + anot_line, use_container_width=True)
 
     # ======================
     st.subheader("🔀 Gráfico de Dispersión (X vs Y)")
-    scatter_chart = alt.Chart(df).mark_circle(size=80).encode(
+    # Solo las columnas que dibuja la marca viajan en el spec
+    points = df[[col_x, col_y]] if col_x != col_y else df[[col_x]]
+    scatter_chart = alt.Chart(points).mark_circle(size=80).encode(
         x=alt.X(f"{col_x}:Q", scale=alt.Scale(zero=False)),
         y=alt.Y(f"{col_y}:Q", scale=alt.Scale(zero=False)),
         tooltip=[col_x, col_y],
         color=alt.Color(f"{col_x}:N", scale=alt.Scale(scheme=color_scheme))
     ).properties(width=600, height=400)
 
-    st.altair_chart(scatter_chart, use_container_width=True)
+    with stage("serializacion", "dispersion"):
+        st.altair_chart(scatter_chart, use_container_width=True)
 
 else:
     st.info("📂 Sube un archivo Excel en la barra lateral para comenzar.")
 
+perf_trace.end_run()
+perf_trace.debug_panel()
+
 
 
 # =======================================================================
@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 import openpyxl
 import os  # Import necesario para manejar archivos locales
 
+from upload_loader import ingest
+
+# Columnas que usan las historias (se agregan por Year mientras se lee)
+STORY_COLUMNS = ["Sales", "Profit", "Customers"]
+
 st.set_page_config(page_title="Storytelling Retail", layout="wide")
 
 # ===========================
@@ -23,14 +27,12 @@ if uploaded_file is None:
         st.warning("⚠️ No se ha subido un archivo y el archivo por defecto `data_retail.xlsx` no fue encontrado.")
         st.stop()
 
-# Leer datos
-if uploaded_file.name.endswith(".csv"):
-    df = pd.read_csv(uploaded_file)
-else:
-    df = pd.read_excel(uploaded_file)
+# Leer datos por bloques: vista previa del primer bloque y totales por año
+preview = st.empty()
+data = ingest(uploaded_file, group_by="Year", values=STORY_COLUMNS, keep_rows=False,
+              usecols=["Year"] + STORY_COLUMNS, on_preview=preview.dataframe)
 
 st.success("✅ Archivo cargado correctamente")
-st.dataframe(df.head())
 
 # ===========================
 # 2. Selección de historia
@@ -43,9 +45,10 @@ opcion = st.radio(
 # ===========================
 # 3. Crear historias
 # ===========================
-if "Year" not in df.columns:
+if "Year" not in data.columns:
     st.error("⚠️ Tu archivo debe tener una columna 'Year'.")
 else:
+    df = data.aggregates
     if opcion == "📈 Ventas":
         # Detectar subidas y caídas
         df["Sales_diff"] = df["Sales"].diff()
@@ -0,0 +1,61 @@
+# ==============================================
+# Analítica del Chatbot PQR (embudo y FAQ)
+# ==============================================
+# Lee los contadores que el chat va sumando (chatbot_analytics.py): una
+# consulta de pocas filas, sin recorrer el registro de interacciones.
+#
+#   py -m streamlit run Entrega1_MA/Analitica_chatbot.py
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import chatbot_analytics as analytics
+from chatbot_store import DB_FILE
+
+st.set_page_config(page_title="Analítica Chatbot PQR", page_icon="📈")
+
+
+@st.cache_resource
+def metrics_store():
+    return analytics.MetricsStore(DB_FILE)
+
+
+snapshot = metrics_store().snapshot()
+faq = analytics.faq_summary(snapshot)
+timing = analytics.time_to_radicado(snapshot)
+funnel = pd.DataFrame(analytics.funnel(snapshot))
+
+st.title("📈 Analítica del Chatbot PQR")
+if st.button("🔄 Actualizar"):
+    st.rerun()
+
+started = int(snapshot.get("flujos", 0))
+col0, col1, col2, col3, col4 = st.columns(5)
+col0.metric("Sesiones", f"{int(snapshot.get('sesiones', 0)):,}")
+col1.metric("Flujos iniciados", f"{started:,}")
+col2.metric("Radicados", f"{timing['radicados']:,}",
+            f"{100 * timing['radicados'] / started:.1f}% conversión" if started else None)
+col3.metric("Aciertos FAQ", f"{faq['tasa de acierto']:.0%}", f"{faq['consultas']:,} consultas",
+            delta_color="off")
+col4.metric("Tiempo medio a radicar", f"{timing['promedio_s'] / 60:.1f} min")
+
+# ===========================
+# Embudo del flujo PQR
+# ===========================
+st.subheader("Embudo: ¿dónde abandonan?")
+# Plotly conserva el orden del flujo (st.bar_chart ordena alfabéticamente)
+st.plotly_chart(px.funnel(funnel, x="llegaron", y="paso"), use_container_width=True)
+st.dataframe(funnel, hide_index=True, use_container_width=True)
+
+# ===========================
+# FAQ y tiempos
+# ===========================
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Similitud de la mejor FAQ")
+    st.plotly_chart(px.bar(pd.DataFrame(analytics.similarity_histogram(snapshot)),
+                           x="similitud", y="consultas"), use_container_width=True)
+with col2:
+    st.subheader("Tiempo hasta radicar")
+    st.plotly_chart(px.bar(pd.DataFrame(timing["histograma"]), x="tiempo", y="radicados"),
+                    use_container_width=True)
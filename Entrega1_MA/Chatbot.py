@@ -1,78 +1,83 @@
 # app.py
-import os, re, uuid
-import pandas as pd
-from datetime import datetime
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
+import os
+import time
+import uuid
+
 import streamlit as st
 
+# Raíz del repo en sys.path (lazy_imports, perf_trace)
+import repo_path  # noqa: F401
+import chatbot_analytics as analytics
+import perf_trace
+from chatbot_store import DB_FILE
+from chatbot_writer import PersistenceError, PersistenceQueue
+from lazy_imports import lazy_import
+from perf_trace import stage, timed
+from pqr_engine import WELCOME, PQREngine, new_state
+
+# scikit-learn / scipy solo se cargan con la primera pregunta libre
+faq = lazy_import("faq_index")
+
 # ------------------------------
 # Configuración inicial
 # ------------------------------
 st.set_page_config(page_title="Chatbot PQR", page_icon="📨")
+perf_trace.begin_run("chatbot")
 EXCEL_FILE_INTERACCIONES = "interacciones_chatbot.xlsx"
 EXCEL_FILE_RADICADOS = "radicados_pqr.xlsx"
-
-# Regex validaciones
-EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
-PHONE_RE = re.compile(r"^[+\d][\d\s-]{6,}$")
-DOC_RE = re.compile(r"^[A-Za-z0-9.-]{4,}$")
-TIPOS_VALIDOS = {"p":"Petición","peticion":"Petición",
-                 "q":"Queja","queja":"Queja",
-                 "r":"Reclamo","reclamo":"Reclamo",
-                 "s":"Sugerencia","sugerencia":"Sugerencia"}
-
-def is_valid_email(x): return bool(EMAIL_RE.match(x or ""))
-def is_valid_phone(x): return bool(PHONE_RE.match(x or ""))
-def is_valid_doc(x): return bool(DOC_RE.match(x or ""))
+# Turnos (usuario + bot) que se dibujan en vivo; los anteriores ya están
+# guardados y se consultan por páginas
+HISTORY_TURNS = int(os.environ.get("CHATBOT_HISTORY_TURNS", "10"))
+HISTORY_PAGE = 10
+# Segundos que se espera a que el radicado quede grabado antes de mostrarlo
+RADICADO_WAIT_S = float(os.environ.get("CHATBOT_RADICADO_WAIT_S", "5"))
 
 # ------------------------------
 # Persistencia
 # ------------------------------
+# Interacciones (solo-anexado) y radicados (indexados) en SQLite; el Excel
+# se genera con `py Entrega1_MA/chatbot_store.py export` y el histórico en
+# Excel se migra la primera vez. Un único hilo escritor por proceso graba
+# por lotes: las sesiones solo encolan.
+@st.cache_resource
+def persistence():
+    return PersistenceQueue(DB_FILE, legacy_interacciones=EXCEL_FILE_INTERACCIONES,
+                            legacy_radicados=EXCEL_FILE_RADICADOS)
+
+@timed("persistencia")
 def save_interaction(user_msg, bot_response):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    df_new = pd.DataFrame({"timestamp":[ts],"usuario":[user_msg],"bot":[bot_response]})
-    if os.path.exists(EXCEL_FILE_INTERACCIONES):
-        try:
-            df_exist = pd.read_excel(EXCEL_FILE_INTERACCIONES)
-            df_final = pd.concat([df_exist, df_new], ignore_index=True)
-        except: df_final = df_new
-    else: df_final = df_new
-    df_final.to_excel(EXCEL_FILE_INTERACCIONES, index=False)
+    persistence().save_interaction(user_msg, bot_response, st.session_state.session_id)
 
+@timed("persistencia")
 def save_radicado(form):
-    rid = f"PQR-{datetime.now():%Y%m%d%H%M%S}-{str(uuid.uuid4())[:6].upper()}"
-    row = {
-        "radicado": rid, "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        **form
-    }
-    df_new = pd.DataFrame([row])
-    if os.path.exists(EXCEL_FILE_RADICADOS):
-        try:
-            df_exist = pd.read_excel(EXCEL_FILE_RADICADOS)
-            df_final = pd.concat([df_exist, df_new], ignore_index=True)
-        except: df_final = df_new
-    else: df_final = df_new
-    df_final.to_excel(EXCEL_FILE_RADICADOS, index=False)
+    # Lanza PersistenceError si el radicado no se pudo grabar
+    rid = persistence().save_radicado(form, wait=RADICADO_WAIT_S)
+    started = st.session_state.get("flow_started")
+    if started is not None:
+        persistence().record(analytics.radicado(time.time() - started))
     return rid
 
+@timed("consulta")
+def radicado_status(rid):
+    r = persistence().get_radicado(rid)
+    if not r: return f"No encontré el radicado {rid.upper()}."
+    return f"📄 {r['radicado']} ({r['tipo']}) radicado el {r['fecha']}: estado **{r['estado']}**."
+
 # ------------------------------
-# FAQ mínima
+# FAQ (faq_pqr.csv, índice persistido en .cache/faq_index)
 # ------------------------------
-FAQ_QA = [
-    ("¿Qué es una PQR?","PQR significa Petición, Queja, Reclamo o Sugerencia."),
-    ("¿Cómo radicar una PQR?","Te guiaré paso a paso con tus datos y descripción."),
-    ("¿Cuánto tardan en responder?","Entre 15 y 30 días hábiles normalmente."),
-]
-_vec = TfidfVectorizer()
-X = _vec.fit_transform([q for q,_ in FAQ_QA])
-_nn = NearestNeighbors(n_neighbors=1, metric="cosine").fit(X)
+@st.cache_resource
+def faq_index():
+    return faq.FaqIndex.load_or_build(faq.FAQ_FILE, faq.INDEX_DIR)
 
+@timed("consulta")
 def retrieve_faq(msg, th=0.35):
-    if not msg.strip(): return None
-    dist, idx = _nn.kneighbors(_vec.transform([msg]))
-    sim = 1 - float(dist[0][0])
-    return FAQ_QA[int(idx[0][0])][1] if sim >= th else None
+    index = faq_index()
+    hit = index.match(msg)
+    similarity = hit[1] if hit else 0.0
+    # Aciertos e histograma de similitud (Analitica_chatbot.py)
+    persistence().record(analytics.faq_lookup(similarity, similarity >= th))
+    return index.answers[hit[0]] if hit and similarity >= th else None
 
 # ------------------------------
 # Estado inicial
@@ -80,63 +85,50 @@ def retrieve_faq(msg, th=0.35):
 if "chat" not in st.session_state:
     st.session_state.chat = []
 if "state" not in st.session_state:
-    st.session_state.state = {"step":"welcome","form":{}}
-
-WELCOME = "¡Hola! Soy tu asistente de PQR.\nEscribe P, Q, R o S para empezar."
+    st.session_state.state = new_state()
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+    # Turnos sacados de session_state (ya guardados) y páginas de ellos a la vista
+    st.session_state.compacted = 0
+    st.session_state.history_pages = 0
+    # Inicio del flujo actual (al elegir el tipo), para el tiempo hasta radicar
+    st.session_state.flow_started = None
+    persistence().record(analytics.session_start())
+
+
+def compact_history(chat, turns):
+    """Deja en ``chat`` solo los últimos ``turns`` turnos; devuelve cuántos salieron.
+
+    Se llama después de guardar el turno, así que lo que sale ya está en la
+    base (la bienvenida no se guarda: solo se descarta).
+    """
+    excess = len(chat) - 2 * turns
+    if excess <= 0:
+        return 0
+    dropped = sum(1 for role, _ in chat[:excess] if role == "user")
+    del chat[:excess]
+    return dropped
 
 # ------------------------------
-# Conversación
+# Conversación (tabla de transiciones en pqr_engine.py)
 # ------------------------------
+engine = PQREngine(retrieve_faq=retrieve_faq, submit=save_radicado, lookup=radicado_status)
+
+@timed("transformacion", "pqr_engine")
 def handle_message(user_msg):
     state = st.session_state.state
-    form = state["form"]
-    step = state["step"]
-    txt, low = (user_msg or ""), (user_msg or "").lower()
-
-    faq = retrieve_faq(txt)
-    bot = ""
-
-    if low in {"reiniciar","reset","/reset"}:
-        st.session_state.state = {"step":"welcome","form":{}}
-        return "Reiniciado. " + WELCOME
-
-    if step == "welcome":
-        t = TIPOS_VALIDOS.get(low)
-        if not t:
-            return (faq + "\n\n" if faq else "") + "Indica el tipo: P,Q,R o S."
-        form["tipo"] = t; state["step"] = "nombre"; bot = f"Tipo {t}. Tu nombre completo?"
-    elif step == "nombre":
-        form["nombre"] = txt; state["step"] = "documento"; bot = "Número de documento?"
-    elif step == "documento":
-        if not is_valid_doc(txt): bot = "Documento no válido. Ingresa de nuevo:"
-        else: form["documento"]=txt; state["step"]="email"; bot="Correo electrónico?"
-    elif step == "email":
-        if not is_valid_email(txt): bot="Email inválido. Intenta otra vez:"
-        else: form["email"]=txt; state["step"]="telefono"; bot="Teléfono de contacto?"
-    elif step == "telefono":
-        if not is_valid_phone(txt): bot="Teléfono inválido. Intenta de nuevo:"
-        else: form["telefono"]=txt; state["step"]="departamento"; bot="Departamento?"
-    elif step == "departamento":
-        form["departamento"]=txt; state["step"]="municipio"; bot="Municipio?"
-    elif step == "municipio":
-        form["municipio"]=txt; state["step"]="canal"; bot="¿Prefieres respuesta por correo o teléfono?"
-    elif step == "canal":
-        form["canal"]=txt; state["step"]="descripcion"; bot="Describe tu caso brevemente."
-    elif step == "descripcion":
-        form["descripcion"]=txt; state["step"]="autorizo"; bot="¿Autorizas uso de datos (sí/no)?"
-    elif step == "autorizo":
-        form["autorizo"]=txt; state["step"]="confirmar"
-        bot = f"Gracias. Confirma para radicar:\n{form}\nEscribe 'confirmar' o 'reiniciar'."
-    elif step == "confirmar":
-        if low.startswith("confirmar"):
-            rid = save_radicado(form)
-            st.session_state.state = {"step":"welcome","form":{}}
-            bot = f"✅ Radicado generado: {rid}"
-        else: bot = "Debes escribir 'confirmar' para finalizar o 'reiniciar'."
-    else:
-        bot = "No entendí."
-
-    return bot
+    before = state["step"]
+    try:
+        response = engine.handle(state, user_msg)
+    except PersistenceError:
+        # El motor no avanzó: el formulario sigue esperando la confirmación
+        response = "⚠️ No se pudo guardar el radicado. Escribe 'confirmar' para intentarlo de nuevo."
+    after = state["step"]
+    if before == "welcome" and after != "welcome":
+        st.session_state.flow_started = time.time()
+    # Embudo: contadores por paso, sin releer el registro de interacciones
+    persistence().record(analytics.step_change(before, after))
+    return response
 
 # ------------------------------
 # Interfaz Streamlit
@@ -147,10 +139,27 @@ st.write("Radica tu Petición, Queja, Reclamo o Sugerencia.")
 if not st.session_state.chat:
     st.session_state.chat.append(("bot", WELCOME))
 
-# Mostrar historial
-for role, msg in st.session_state.chat:
-    with st.chat_message(role):
-        st.markdown(msg)
+# Turnos anteriores: colapsados y leídos de la base solo al pedir una página
+if st.session_state.compacted:
+    with st.expander(f"🕘 {st.session_state.compacted} turnos anteriores"):
+        shown = min(st.session_state.history_pages * HISTORY_PAGE, st.session_state.compacted)
+        if shown < st.session_state.compacted and st.button("⬆️ Cargar turnos anteriores"):
+            st.session_state.history_pages += 1
+        if st.session_state.history_pages:
+            live = sum(1 for role, _ in st.session_state.chat if role == "user")
+            with stage("consulta", "historial_anterior"):
+                older = persistence().session_turns(
+                    st.session_state.session_id,
+                    st.session_state.history_pages * HISTORY_PAGE, skip_recent=live)
+            for user_msg, bot_msg in older:
+                st.markdown(f"**Tú:** {user_msg}\n\n**Bot:** {bot_msg}")
+                st.divider()
+
+# Mostrar historial (ventana fija: el costo del rerun no crece con la charla)
+with stage("serializacion", "historial"):
+    for role, msg in st.session_state.chat:
+        with st.chat_message(role):
+            st.markdown(msg)
 
 # Entrada de usuario
 if prompt := st.chat_input("Escribe tu mensaje..."):
@@ -158,4 +167,10 @@ if prompt := st.chat_input("Escribe tu mensaje..."):
     bot_response = handle_message(prompt)
     st.session_state.chat.append(("bot", bot_response))
     save_interaction(prompt, bot_response)
+    st.session_state.compacted += compact_history(st.session_state.chat, HISTORY_TURNS)
+    # st.rerun() corta el script: la corrida se cierra antes
+    perf_trace.end_run()
     st.rerun()
+
+perf_trace.end_run()
+perf_trace.debug_panel()
@@ -1,24 +1,56 @@
 # ==============================================
 # Storytelling de Ventas y Rentabilidad (Superstore)
 # ==============================================
-import pandas as pd
-import plotly.express as px
-from plotly.subplots import make_subplots
 import streamlit as st
 
+# Raíz del repo en sys.path (perf_trace, chart_prep)
+import repo_path  # noqa: F401
+import perf_trace
+from perf_trace import stage
+from superstore_backend import DEFAULT_BACKEND
+from superstore_data import source_signature
+from superstore_story import load_cube as build_cube, figure_key, slide_figure
+from figure_cache import FIGURE_DIR, FigureCache
+
 
 url = "Entrega1_MA/superstore_base.csv"
-df = pd.read_csv(url, encoding="latin1", sep=";", engine="python")
+
+# Tiempos por etapa de este rerun (panel con ?debug=1, traza en .cache/trace.jsonl)
+perf_trace.begin_run("storytelling_superstore")
 
 #df = pd.read_csv("/content/superstore.csv", encoding="latin1", sep=";", engine="python")
-# Asegurarse de que las fechas estén en formato datetime
-df["Order Date"] = pd.to_datetime(df["Order Date"])
-df["Ship Date"] = pd.to_datetime(df["Ship Date"])
+# La carga, los resúmenes y las figuras viven en superstore_story.py (sin
+# Streamlit). Con SUPERSTORE_BACKEND=pandas (por defecto) en memoria solo se
+# conserva el cubo de agregados; con duckdb o polars cada slide consulta el
+# archivo leyendo solo sus columnas. La firma del archivo invalida la caché.
+# Al crecer el CSV cambia la firma y se refresca solo el delta; se conservan
+# a lo sumo dos versiones del cubo en memoria
+@st.cache_resource(max_entries=2)
+def load_cube(path, signature, backend):
+    return build_cube(path, backend)
+
+with stage("carga", "load_cube"):
+    data_version = source_signature(url)
+    cube = load_cube(url, data_version, DEFAULT_BACKEND)
+
+# Figuras ya construidas, compartidas por todas las sesiones (LRU por
+# slide, año y versión de datos) y en disco con los demás procesos;
+# warmup.py las deja listas antes de la primera visita
+@st.cache_resource
+def figure_cache():
+    return FigureCache(maxsize=64, folder=FIGURE_DIR)
+
+
+def cached_figure(slide, selected_year):
+    key = figure_key(slide, selected_year, data_version)
+    with stage("figura", slide):
+        return figure_cache().get_or_build(key, lambda: slide_figure(slide, cube, selected_year))
+
 
-# Crear la columna Delivery Days (diferencia en días)
-df["Delivery Days"] = (df["Ship Date"] - df["Order Date"]).dt.days
-# Crear la columna Year (diferencia en días)
-df["Year"] = df["Order Date"].dt.year
+def show_figure(fig, name):
+    # st.plotly_chart serializa la figura a JSON para el navegador
+    with stage("serializacion", name):
+        st.plotly_chart(fig, use_container_width=True)
 
 
 # ===========================
@@ -42,68 +74,18 @@ opcion = st.radio(
 # SLIDE 1 – Panorama Ventas y Profit
 # ---------------------------
 if opcion == "📈 Panorama Ventas & Profit":
-    cat_summary = df.groupby("Category")[["Sales", "Profit"]].sum().reset_index()
-
-    df_melt = cat_summary.melt(
-        id_vars="Category",
-        value_vars=["Sales", "Profit"],
-        var_name="Métrica",
-        value_name="Valor"
-    )
-
-    fig1 = px.bar(
-        df_melt,
-        x="Category",
-        y="Valor",
-        color="Métrica",
-        barmode="group",
-        text="Valor",
-        title="Panorama de Ventas y Rentabilidad por Categoría"
-    )
-    fig1.update_traces(
-        texttemplate="%{text:.2s}",
-        textposition="outside",
-        marker=dict(line=dict(width=1, color="black"))
-    )
-    fig1.update_layout(
-        yaxis_title="Monto (USD)",
-        xaxis_title="Categoría",
-        uniformtext_minsize=10,
-        uniformtext_mode="hide",
-        legend_title_text="Métrica",
-        yaxis=dict(tickformat=".2s")
-    )
-
-    st.plotly_chart(fig1, use_container_width=True)
+    fig1 = cached_figure("categoria", None)
+
+    show_figure(fig1, "categoria")
     st.info("Indicador: La categoría tecnología, tiene ventas inferiores a muebles en un 46%  pero el profit (Beneficio) de tecnologia es 15 veces superior al de muebles")
 
 # ---------------------------
 # SLIDE 2 – Segmentación de Clientes
 # ---------------------------
 elif opcion == "👥 Segmentación de Clientes":
-    seg_summary = df.groupby("Segment")[["Sales", "Profit"]].sum().reset_index()
-
-    fig2 = make_subplots(
-        rows=1, cols=2,
-        specs=[[{"type": "domain"}, {"type": "domain"}]],
-        subplot_titles=("Ventas por Segmento", "Rentabilidad por Segmento")
-    )
-
-    fig_sales = px.pie(seg_summary, names="Segment", values="Sales")
-    for trace in fig_sales.data:
-        fig2.add_trace(trace, row=1, col=1)
-
-    fig_profit = px.pie(seg_summary, names="Segment", values="Profit")
-    for trace in fig_profit.data:
-        fig2.add_trace(trace, row=1, col=2)
+    fig2 = cached_figure("segmento", None)
 
-    fig2.update_layout(
-        title_text="Segmentación de Clientes",
-        width=1000,
-        height=500
-    )
-
-    st.plotly_chart(fig2, use_container_width=True)
+    show_figure(fig2, "segmento")
     st.info("""1. El segmento Consumer domina tanto en ventas como en rentabilidad
 
 Representa 53.3% de las ventas y 50.7% de la rentabilidad.
@@ -135,66 +117,23 @@ Estrategia: revisar políticas comerciales, condiciones de crédito y costos aso
 # --- Columna Year para el filtro ---
 elif opcion == "🌎 Ventas por Región y tiempo promedio de entrega":
     # --- Filtro por año ---
-    years = df["Year"].unique()
-    selected_year = st.selectbox("Selecciona un año", sorted(years))
-
-    # Filtrar por el año elegido
-    df_year = df[df["Year"] == selected_year]
+    with stage("agregado", "years"):
+        years = cube.years()
+    selected_year = st.selectbox("Selecciona un año", years)
 
     # --- Línea: tiempo de entrega ---
-    delivery_trend = (df_year.groupby("Order Date")["Delivery Days"]
-                      .mean()
-                      .reset_index())
-
-    fig_line = px.line(
-        delivery_trend,
-        x="Order Date",
-        y="Delivery Days",
-        title=f"Tiempo promedio de entrega ({selected_year})"
-    )
-    fig_line.update_traces(mode="lines+markers")
+    fig_line = cached_figure("entrega", selected_year)
 
     # --- Barras: ventas y profit por región ---
-    region_summary = (df_year.groupby("Region")[["Sales", "Profit"]]
-                      .sum()
-                      .reset_index()
-                      .sort_values("Sales", ascending=True))
-
-    df_melt = region_summary.melt(
-        id_vars="Region",
-        value_vars=["Sales", "Profit"],
-        var_name="Métrica",
-        value_name="Valor"
-    )
-
-    fig_bar = px.bar(
-        df_melt,
-        x="Valor",
-        y="Region",
-        color="Métrica",
-        orientation="h",
-        barmode="group",
-        text="Valor",
-        title=f"Ventas y Rentabilidad por Región ({selected_year})"
-    )
-    fig_bar.update_traces(
-        texttemplate="%{text:.2s}",
-        textposition="outside",
-        marker=dict(line=dict(width=1, color="black"))
-    )
-    fig_bar.update_layout(
-        xaxis_title="Monto (USD)",
-        yaxis_title="Región",
-        uniformtext_minsize=10,
-        uniformtext_mode="hide",
-        legend_title_text="Métrica",
-        xaxis=dict(tickformat=".2s")
-    )
+    fig_bar = cached_figure("region", selected_year)
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_line, use_container_width=True)
+        show_figure(fig_line, "entrega")
     with col2:
-        st.plotly_chart(fig_bar, use_container_width=True)
+        show_figure(fig_bar, "region")
 
     st.info("Indicador: El Oeste concentra las mayores ventas, mientras que algunas regiones presentan pérdidas o bajo desempeño. Esto orienta estrategias regionales.")
+
+perf_trace.end_run()
+perf_trace.debug_panel()
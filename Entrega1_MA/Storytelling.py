@@ -1,10 +1,26 @@
 # ==============================================
 # Storytelling de Ventas y Rentabilidad (Superstore)
 # ==============================================
-import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from superstore_backend import DEFAULT_BACKEND
+from superstore_data import source_signature
+from superstore_cube import category_summary, segment_summary, region_summary
+from superstore_story import load_cube as build_cube, delivery_trend, melt_metrics
+
+url = "Entrega1_MA/superstore_base.csv"
+
+# Los datos salen del cubo de agregados de superstore_story.py (el mismo
+# de Entrega_storytelling), guardado una vez por versión del CSV
+# Al crecer el CSV cambia la firma y se refresca solo el delta; se conservan
+# a lo sumo dos versiones del cubo en memoria
+@st.cache_resource(max_entries=2)
+def load_cube(path, signature, backend):
+    return build_cube(path, backend)
+
+cube = load_cube(url, source_signature(url), DEFAULT_BACKEND)
+
 # ===========================
 # 1. Título
 # ===========================
@@ -23,10 +39,7 @@ opcion = st.radio(
 # ===========================
 
 if opcion == "📈 Panorama Ventas & Profit":
-    cat_summary = df.groupby("Category")[["Sales", "Profit"]].sum().reset_index()
-    df_melt = cat_summary.melt(id_vars="Category",
-                               value_vars=["Sales", "Profit"],
-                               var_name="Métrica", value_name="Valor")
+    df_melt = melt_metrics(category_summary(cube), "Category")
     fig = px.bar(
         df_melt,
         x="Category", y="Valor", color="Métrica",
@@ -40,7 +53,7 @@ if opcion == "📈 Panorama Ventas & Profit":
     st.info("💡 Insight: Algunas categorías venden mucho, pero generan pérdidas o márgenes bajos.")
 
 elif opcion == "👥 Segmentación de Clientes":
-    seg_summary = df.groupby("Segment")[["Sales", "Profit"]].sum().reset_index()
+    seg_summary = segment_summary(cube)
 
     col1, col2 = st.columns(2)
 
@@ -56,20 +69,12 @@ elif opcion == "👥 Segmentación de Clientes":
 
 elif opcion == "🌎 Ventas por Región":
     # --- Línea: tiempo de entrega ---
-    delivery_trend = (df.groupby("Order Date")["Delivery Days"]
-                      .mean()
-                      .reset_index())
-    fig_line = px.line(delivery_trend, x="Order Date", y="Delivery Days",
+    fig_line = px.line(delivery_trend(cube), x="Order Date", y="Delivery Days",
                        title="Tiempo promedio de entrega (Order vs Ship Date)")
     fig_line.update_traces(mode="lines+markers")
 
     # --- Barras: ventas y profit por región ---
-    region_summary = (df.groupby("Region")[["Sales", "Profit"]]
-                      .sum()
-                      .reset_index()
-                      .sort_values("Sales", ascending=True))
-    df_melt = region_summary.melt(id_vars="Region", value_vars=["Sales", "Profit"],
-                                  var_name="Métrica", value_name="Valor")
+    df_melt = melt_metrics(region_summary(cube), "Region")
 
     fig_bar = px.bar(df_melt, x="Valor", y="Region", color="Métrica",
                      orientation="h", barmode="group", text="Valor",
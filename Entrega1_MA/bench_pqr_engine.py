@@ -0,0 +1,167 @@
+# ==============================================
+# Benchmark del motor de conversación PQR
+# ==============================================
+# Reproduce miles de conversaciones guionizadas sobre PQREngine, informa
+# mensajes por segundo y compara cada respuesta con el flujo if/elif que
+# tenía Chatbot.py (legacy_handle, copiado abajo como referencia).
+#
+#   py Entrega1_MA/bench_pqr_engine.py --conversations 5000
+import argparse
+import random
+import time
+
+from pqr_engine import (RADICADO_RE, TIPOS_VALIDOS, WELCOME, PQREngine,
+                        is_valid_doc, is_valid_email, is_valid_phone, new_state)
+
+
+# ------------------------------
+# Flujo original (referencia de comportamiento)
+# ------------------------------
+def legacy_handle(state, user_msg, retrieve_faq, save_radicado, radicado_status):
+    form = state["form"]
+    step = state["step"]
+    txt, low = (user_msg or ""), (user_msg or "").lower()
+
+    faq = retrieve_faq(txt)
+    bot = ""
+
+    if low in {"reiniciar","reset","/reset"}:
+        state.update({"step":"welcome","form":{}})
+        return "Reiniciado. " + WELCOME
+
+    if (step == "welcome" or low.startswith("estado")) and (m := RADICADO_RE.search(txt)):
+        return radicado_status(m.group(0))
+
+    if step == "welcome":
+        t = TIPOS_VALIDOS.get(low)
+        if not t:
+            return (faq + "\n\n" if faq else "") + "Indica el tipo: P,Q,R o S."
+        form["tipo"] = t; state["step"] = "nombre"; bot = f"Tipo {t}. Tu nombre completo?"
+    elif step == "nombre":
+        form["nombre"] = txt; state["step"] = "documento"; bot = "Número de documento?"
+    elif step == "documento":
+        if not is_valid_doc(txt): bot = "Documento no válido. Ingresa de nuevo:"
+        else: form["documento"]=txt; state["step"]="email"; bot="Correo electrónico?"
+    elif step == "email":
+        if not is_valid_email(txt): bot="Email inválido. Intenta otra vez:"
+        else: form["email"]=txt; state["step"]="telefono"; bot="Teléfono de contacto?"
+    elif step == "telefono":
+        if not is_valid_phone(txt): bot="Teléfono inválido. Intenta de nuevo:"
+        else: form["telefono"]=txt; state["step"]="departamento"; bot="Departamento?"
+    elif step == "departamento":
+        form["departamento"]=txt; state["step"]="municipio"; bot="Municipio?"
+    elif step == "municipio":
+        form["municipio"]=txt; state["step"]="canal"; bot="¿Prefieres respuesta por correo o teléfono?"
+    elif step == "canal":
+        form["canal"]=txt; state["step"]="descripcion"; bot="Describe tu caso brevemente."
+    elif step == "descripcion":
+        form["descripcion"]=txt; state["step"]="autorizo"; bot="¿Autorizas uso de datos (sí/no)?"
+    elif step == "autorizo":
+        form["autorizo"]=txt; state["step"]="confirmar"
+        bot = f"Gracias. Confirma para radicar:\n{form}\nEscribe 'confirmar' o 'reiniciar'."
+    elif step == "confirmar":
+        if low.startswith("confirmar"):
+            rid = save_radicado(form)
+            state.update({"step":"welcome","form":{}})
+            bot = f"✅ Radicado generado: {rid}"
+        else: bot = "Debes escribir 'confirmar' para finalizar o 'reiniciar'."
+    else:
+        bot = "No entendí."
+
+    return bot
+
+
+# ------------------------------
+# Conversaciones guionizadas
+# ------------------------------
+VALID = {
+    "tipo": ["P", "q", "Reclamo", "sugerencia", "peticion"],
+    "nombre": ["Ana Pérez", "Luis Gómez", ""],
+    "documento": ["1020304050", "CC-1234.5"],
+    "email": ["ana@correo.com", "luis.g@empresa.co"],
+    "telefono": ["+57 300 123 4567", "3001234567"],
+    "departamento": ["Antioquia", "Cundinamarca"],
+    "municipio": ["Medellín", "Bogotá"],
+    "canal": ["correo", "teléfono"],
+    "descripcion": ["Cobro doble en la factura", "Demora en la entrega",
+                    "Sigue sin respuesta el PQR-20250101120000-ABC123"],
+    "autorizo": ["sí", "no"],
+}
+INVALID = {
+    "tipo": ["hola", "¿Qué es una PQR?", "x"],
+    "documento": ["12", "doc con espacios"],
+    "email": ["ana@", "sin-arroba.com"],
+    "telefono": ["abc", "12"],
+}
+FIELDS = list(VALID)
+
+
+def script(rng):
+    """Mensajes de una conversación: datos válidos con errores, consultas y reinicios."""
+    msgs = []
+    for field in FIELDS:
+        if field in INVALID and rng.random() < 0.3:
+            msgs.append(rng.choice(INVALID[field]))
+        if rng.random() < 0.02:
+            msgs.append("estado PQR-20250101120000-ABC123")
+        if rng.random() < 0.01:
+            msgs.append("reiniciar")
+            return msgs
+        msgs.append(rng.choice(VALID[field]))
+    if rng.random() < 0.2:
+        msgs.append("no sé")
+    msgs.append(rng.choice(["confirmar", "Confirmar por favor"]))
+    return msgs
+
+
+def fake_faq(msg):
+    return "PQR significa Petición, Queja, Reclamo o Sugerencia." if "pqr" in msg.lower() else None
+
+
+def make_submit():
+    counter = iter(range(10**9))
+    return lambda form: f"PQR-BENCH-{next(counter):06d}"
+
+
+def fake_status(rid):
+    return f"No encontré el radicado {rid.upper()}."
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del motor PQR")
+    parser.add_argument("--conversations", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    scripts = [script(rng) for _ in range(args.conversations)]
+    n_msgs = sum(len(s) for s in scripts)
+
+    # Comportamiento: misma respuesta y mismo estado mensaje a mensaje
+    engine = PQREngine(retrieve_faq=fake_faq, submit=make_submit(), lookup=fake_status)
+    legacy_submit = make_submit()
+    for msgs in scripts:
+        s_new, s_old = new_state(), new_state()
+        for msg in msgs:
+            got = engine.handle(s_new, msg)
+            want = legacy_handle(s_old, msg, fake_faq, legacy_submit, fake_status)
+            assert got == want, f"{msg!r}: {got!r} != {want!r}"
+            assert s_new == s_old, f"{msg!r}: {s_new} != {s_old}"
+
+    # Rendimiento
+    for name, handle in (
+        ("tabla", lambda state, msg: engine.handle(state, msg)),
+        ("if/elif", lambda state, msg: legacy_handle(state, msg, fake_faq, legacy_submit, fake_status)),
+    ):
+        t0 = time.perf_counter()
+        for msgs in scripts:
+            state = new_state()
+            for msg in msgs:
+                handle(state, msg)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:8s} {n_msgs} mensajes en {elapsed:.3f}s -> {n_msgs / elapsed:,.0f} msg/s")
+    print(f"Comportamiento idéntico en {args.conversations} conversaciones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# ==============================================
+# Benchmark de las historias Superstore (pytest-benchmark)
+# ==============================================
+# Mide por separado cada etapa de superstore_story.py sobre el CSV incluido
+# y sobre versiones escaladas (filas repetidas N veces):
+#
+#   carga       read_superstore_csv (CSV -> esquema compacto + derivadas) y
+#               load_superstore con la caché Parquet ya creada
+#   transform   fechas, Delivery Days y Year (add_derived_columns)
+#   agregado    cubo de rollup + resúmenes de cada slide
+#   figuras     construcción de las figuras Plotly de cada slide
+#   consulta    por motor (superstore_backend.py): abrir el archivo y
+#               resolver todas las consultas de los slides. Sin el rollup
+#               incremental (SUPERSTORE_INCREMENTAL): desde la segunda ronda
+#               solo mediría el refresco vacío, no una consulta sobre los datos
+#
+# Escalas con BENCH_SCALES (por defecto "1,10"). Cada grupo de la tabla es
+# una etapa; las filas son las escalas / motores.
+#
+#   pytest Entrega1_MA/bench_superstore.py
+#   BENCH_SCALES=1,10,50 pytest Entrega1_MA/bench_superstore.py -k "carga or agregado"
+#   pytest Entrega1_MA/bench_superstore.py --benchmark-save=base
+#   pytest Entrega1_MA/bench_superstore.py --benchmark-compare --benchmark-compare-fail=median:20%
+#
+# Con --benchmark-compare-fail la corrida falla si alguna etapa es más lenta
+# que la referencia guardada (en .benchmarks/).
+import os
+
+import pandas as pd
+import pytest
+
+import repo_path  # noqa: F401
+import superstore_backend
+from superstore_backend import BACKENDS, open_source
+from superstore_data import CSV_OPTIONS, add_derived_columns, load_superstore, read_superstore_csv
+from superstore_cube import RollupCube, category_summary, segment_summary, region_summary
+from superstore_schema import compact, csv_dtypes
+from superstore_story import (category_figure, segment_figure, delivery_figure,
+                              region_figure, delivery_trend)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "superstore_base.csv")
+SCALES = [int(s) for s in os.environ.get("BENCH_SCALES", "1,10").split(",")]
+
+
+def write_scaled(raw: pd.DataFrame, scale: int, folder: str) -> str:
+    """CSV con las filas repetidas ``scale`` veces (Row ID renumerado)."""
+    path = os.path.join(folder, f"superstore_x{scale}.csv")
+    scaled = pd.concat([raw] * scale, ignore_index=True)
+    scaled["Row ID"] = range(1, len(scaled) + 1)
+    scaled.to_csv(path, index=False, **CSV_OPTIONS)
+    return path
+
+
+def slide_queries(cube) -> None:
+    category_summary(cube)
+    segment_summary(cube)
+    for year in cube.years():
+        region_summary(cube, year)
+        delivery_trend(cube, year)
+
+
+def aggregate(df: pd.DataFrame) -> RollupCube:
+    cube = RollupCube.from_frame(df)
+    slide_queries(cube)
+    return cube
+
+
+def build_figures(cube: RollupCube) -> None:
+    category_figure(cube)
+    segment_figure(cube)
+    for year in cube.years():
+        delivery_figure(cube, year)
+        region_figure(cube, year)
+
+
+# ------------------------------
+# Datos por escala (se preparan una vez por sesión, fuera de la medición)
+# ------------------------------
+@pytest.fixture(scope="session", params=SCALES, ids=lambda s: f"x{s}")
+def csv_path(request, tmp_path_factory):
+    if request.param == 1:
+        return SOURCE
+    raw = pd.read_csv(SOURCE, **CSV_OPTIONS)
+    return write_scaled(raw, request.param, str(tmp_path_factory.mktemp("superstore")))
+
+
+@pytest.fixture(scope="session")
+def frame(csv_path):
+    return read_superstore_csv(csv_path)
+
+
+@pytest.fixture(scope="session")
+def cube(frame):
+    return RollupCube.from_frame(frame)
+
+
+# ------------------------------
+# Etapas
+# ------------------------------
+@pytest.mark.benchmark(group="carga")
+def test_carga_csv(benchmark, csv_path):
+    df = benchmark(read_superstore_csv, csv_path)
+    assert len(df)
+
+
+@pytest.mark.benchmark(group="carga")
+def test_carga_parquet(benchmark, csv_path):
+    # Primera llamada fuera de la medición: crea la caché junto al CSV
+    load_superstore(csv_path)
+    df = benchmark(load_superstore, csv_path)
+    assert len(df)
+
+
+@pytest.mark.benchmark(group="transform")
+def test_transform(benchmark, csv_path):
+    raw = compact(pd.read_csv(csv_path, dtype=csv_dtypes(), **CSV_OPTIONS))
+    # add_derived_columns modifica el frame: cada ronda parte de una copia
+    df = benchmark.pedantic(add_derived_columns, setup=lambda: ((raw.copy(),), {}), rounds=10)
+    assert "Year" in df
+
+
+@pytest.mark.benchmark(group="agregado")
+def test_agregado(benchmark, frame):
+    cube = benchmark(aggregate, frame)
+    assert cube.years()
+
+
+@pytest.mark.benchmark(group="figuras")
+def test_figuras(benchmark, cube):
+    benchmark(build_figures, cube)
+
+
+@pytest.mark.benchmark(group="consulta")
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_consulta(benchmark, csv_path, backend, monkeypatch):
+    if backend != "pandas":
+        pytest.importorskip(backend)
+    monkeypatch.setattr(superstore_backend, "INCREMENTAL", False)
+    benchmark(lambda: slide_queries(open_source(csv_path, backend)))
@@ -0,0 +1,139 @@
+# ==============================================
+# Analítica incremental del Chatbot PQR
+# ==============================================
+# Mientras el chat procesa mensajes se suman contadores en la tabla
+# `metricas` de chatbot_pqr.db (clave -> valor). Los deltas viajan por la
+# cola de chatbot_writer.py y se graban con su lote (UPSERT valor = valor +
+# delta), así que no agregan escrituras propias. Leer es un SELECT de unas
+# decenas de filas: no depende del tamaño del registro de interacciones.
+#
+# Claves (todas aditivas):
+#   sesiones                 sesiones del chat abiertas
+#   flujos                   flujos iniciados (de welcome al primer paso; una
+#                            sesión puede radicar varias PQR)
+#   paso:<paso>              veces que un flujo llegó al paso
+#   radicados                flujos terminados
+#   faq:consultas            llamadas a retrieve_faq
+#   faq:aciertos             consultas respondidas (similitud >= umbral)
+#   faq:sim:<i>              histograma de la mejor similitud (tramos de 0.1)
+#   radicado:segundos        suma de segundos desde elegir el tipo hasta radicar
+#   radicado:t:<i>           histograma de ese tiempo (TIME_BUCKETS_S)
+#
+# La página Analitica_chatbot.py muestra el embudo y los histogramas.
+import threading
+from collections import Counter
+
+from chatbot_store import DB_FILE, connect
+from pqr_engine import STEPS
+
+# Pasos del embudo: welcome es la espera entre flujos, no un paso del flujo
+FUNNEL = [s for s in STEPS if s != "welcome"] + ["radicado"]
+SIM_BINS = 10
+# Límites superiores (segundos) de los tramos de tiempo hasta radicar
+TIME_BUCKETS_S = [60, 120, 300, 600, 1800]
+
+
+def _time_label(i: int) -> str:
+    if i == len(TIME_BUCKETS_S):
+        return f"> {TIME_BUCKETS_S[-1] // 60} min"
+    low = 0 if i == 0 else TIME_BUCKETS_S[i - 1] // 60
+    return f"{low}-{TIME_BUCKETS_S[i] // 60} min"
+
+
+# ------------------------------
+# Deltas de cada evento
+# ------------------------------
+def session_start() -> Counter:
+    return Counter({"sesiones": 1})
+
+
+def step_change(before: str, after: str) -> Counter:
+    """Un mensaje movió el flujo de ``before`` a ``after``.
+
+    Salir de welcome inicia un flujo (también tras radicar o reiniciar);
+    volver a welcome no cuenta: el flujo terminó o se abandonó en ``before``.
+    """
+    if after == before or after == "welcome":
+        return Counter()
+    deltas = Counter({f"paso:{after}": 1})
+    if before == "welcome":
+        deltas["flujos"] += 1
+    return deltas
+
+
+def faq_lookup(similarity: float, hit: bool) -> Counter:
+    bucket = min(int(max(similarity, 0.0) * SIM_BINS), SIM_BINS - 1)
+    return Counter({"faq:consultas": 1, "faq:aciertos": int(hit), f"faq:sim:{bucket}": 1})
+
+
+def radicado(seconds: float) -> Counter:
+    bucket = sum(seconds > limit for limit in TIME_BUCKETS_S)
+    return Counter({"radicados": 1, "radicado:segundos": seconds, f"radicado:t:{bucket}": 1})
+
+
+# ------------------------------
+# Almacenamiento
+# ------------------------------
+class MetricsStore:
+    """Contadores acumulados (una fila por clave)."""
+
+    def __init__(self, path: str = DB_FILE):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS metricas ("
+                " clave TEXT PRIMARY KEY,"
+                " valor REAL NOT NULL)"
+            )
+
+    def add(self, deltas: dict) -> None:
+        """Suma los deltas en una transacción."""
+        rows = [(k, v) for k, v in deltas.items() if v]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO metricas (clave, valor) VALUES (?, ?)"
+                " ON CONFLICT(clave) DO UPDATE SET valor = valor + excluded.valor", rows)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.conn.execute("SELECT clave, valor FROM metricas").fetchall())
+
+
+# ------------------------------
+# Lecturas para la página
+# ------------------------------
+def funnel(snapshot: dict) -> list:
+    """Filas (paso, llegaron, abandonaron aquí, % de los flujos) en orden del flujo."""
+    reached = [snapshot.get("radicados" if s == "radicado" else f"paso:{s}", 0) for s in FUNNEL]
+    start = snapshot.get("flujos", 0) or 1
+    rows = []
+    for i, (step, n) in enumerate(zip(FUNNEL, reached)):
+        following = reached[i + 1] if i + 1 < len(reached) else n
+        rows.append({"paso": step, "llegaron": int(n), "abandonaron": int(max(n - following, 0)),
+                     "% de los flujos": round(100 * n / start, 1)})
+    return rows
+
+
+def faq_summary(snapshot: dict) -> dict:
+    queries = int(snapshot.get("faq:consultas", 0))
+    hits = int(snapshot.get("faq:aciertos", 0))
+    return {"consultas": queries, "aciertos": hits,
+            "tasa de acierto": hits / queries if queries else 0.0}
+
+
+def similarity_histogram(snapshot: dict) -> list:
+    return [{"similitud": f"{i / SIM_BINS:.1f}-{(i + 1) / SIM_BINS:.1f}",
+             "consultas": int(snapshot.get(f"faq:sim:{i}", 0))} for i in range(SIM_BINS)]
+
+
+def time_to_radicado(snapshot: dict) -> dict:
+    count = int(snapshot.get("radicados", 0))
+    total = snapshot.get("radicado:segundos", 0.0)
+    return {"radicados": count,
+            "promedio_s": total / count if count else 0.0,
+            "histograma": [{"tiempo": _time_label(i),
+                            "radicados": int(snapshot.get(f"radicado:t:{i}", 0))}
+                           for i in range(len(TIME_BUCKETS_S) + 1)]}
@@ -0,0 +1,296 @@
+# ==============================================
+# Persistencia del Chatbot PQR (SQLite en modo WAL)
+# ==============================================
+# Cada mensaje es un INSERT (O(1)) en lugar de leer y reescribir el Excel
+# completo. El .xlsx se genera bajo demanda con el comando de exportación:
+#
+#   py Entrega1_MA/chatbot_store.py export
+#
+# (se puede programar con cron / el Programador de tareas).
+#
+# pandas solo se importa al migrar/exportar Excel: abrir el chatbot y
+# guardar mensajes no lo carga.
+import argparse
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DB_FILE = "chatbot_pqr.db"
+EXCEL_FILE_INTERACCIONES = "interacciones_chatbot.xlsx"
+EXCEL_FILE_RADICADOS = "radicados_pqr.xlsx"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Columnas que hoy tiene interacciones_chatbot.xlsx
+INTERACTION_FIELDS = ["timestamp", "usuario", "bot"]
+# Columnas de radicados_pqr.xlsx (radicado, fecha y el formulario del chat)
+FORM_FIELDS = ["tipo", "nombre", "documento", "email", "telefono", "departamento",
+               "municipio", "canal", "descripcion", "autorizo"]
+RADICADO_FIELDS = ["radicado", "fecha"] + FORM_FIELDS
+ESTADO_INICIAL = "Radicado"
+
+
+def _to_rows(df, fields):
+    """Filas listas para executemany (NaN -> None, fechas -> texto)."""
+    df = df.reindex(columns=fields).astype(object)
+    df = df.where(df.notna(), None)
+    for col in ("timestamp", "fecha"):
+        if col in df.columns:
+            df[col] = df[col].map(
+                lambda v: v.strftime(TIMESTAMP_FORMAT) if hasattr(v, "strftime") else v)
+    return list(df.itertuples(index=False, name=None))
+
+
+def connect(path: str = DB_FILE) -> sqlite3.Connection:
+    """Conexión compartible entre hilos, con WAL para lectores concurrentes."""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class InteractionLog:
+    """Registro de solo-anexado de los mensajes del chat."""
+
+    def __init__(self, path: str = DB_FILE, legacy_xlsx: str = None):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS interacciones ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " timestamp TEXT NOT NULL,"
+                " usuario TEXT,"
+                " bot TEXT,"
+                " session TEXT)"
+            )
+            # Bases creadas antes de guardar la sesión del chat
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(interacciones)")}
+            if "session" not in columns:
+                self.conn.execute("ALTER TABLE interacciones ADD COLUMN session TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_interacciones_session"
+                              " ON interacciones (session, id)")
+        if legacy_xlsx:
+            self.import_xlsx(legacy_xlsx)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM interacciones").fetchone()[0]
+
+    def append(self, user_msg: str, bot_response: str, ts: str = None,
+               session: str = None) -> None:
+        ts = ts or datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.append_many([(ts, user_msg, bot_response, session)])
+
+    def append_many(self, rows) -> None:
+        """Inserta filas (timestamp, usuario, bot, session) en una sola transacción."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO interacciones (timestamp, usuario, bot, session) VALUES (?, ?, ?, ?)",
+                rows)
+
+    def session_turns(self, session: str, limit: int, skip_recent: int = 0) -> list:
+        """Hasta ``limit`` turnos (usuario, bot) de una sesión, en orden.
+
+        Se omiten los ``skip_recent`` más recientes (los que la app aún muestra).
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT usuario, bot FROM interacciones WHERE session = ?"
+                " ORDER BY id DESC LIMIT ? OFFSET ?", (session, limit, skip_recent)).fetchall()
+        return rows[::-1]
+
+    def import_xlsx(self, path: str) -> int:
+        """Migra el histórico de Excel si la tabla aún está vacía.
+
+        Devuelve el número de filas importadas.
+        """
+        if not os.path.exists(path) or len(self):
+            return 0
+        import pandas as pd
+        df = pd.read_excel(path)
+        missing = set(INTERACTION_FIELDS) - set(df.columns)
+        if missing:
+            raise ValueError(f"{path} no tiene las columnas {sorted(missing)}")
+        rows = _to_rows(df, INTERACTION_FIELDS)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO interacciones (timestamp, usuario, bot) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def to_frame(self) -> "pd.DataFrame":
+        import pandas as pd
+        with self.lock:
+            return pd.read_sql_query(
+                "SELECT timestamp, usuario, bot FROM interacciones ORDER BY id", self.conn)
+
+    def export_xlsx(self, path: str = EXCEL_FILE_INTERACCIONES) -> int:
+        """Escribe el .xlsx completo (mismas columnas que antes)."""
+        df = self.to_frame()
+        tmp = path + ".tmp.xlsx"
+        df.to_excel(tmp, index=False)
+        os.replace(tmp, path)
+        return len(df)
+
+
+def new_radicado_id(now: datetime = None) -> str:
+    now = now or datetime.now()
+    return f"PQR-{now:%Y%m%d%H%M%S}-{str(uuid.uuid4())[:6].upper()}"
+
+
+def radicado_row(radicado: str, now: datetime, form: dict) -> tuple:
+    """Fila en el orden de RADICADO_FIELDS."""
+    return (radicado, now.strftime(TIMESTAMP_FORMAT), *[form.get(c) for c in FORM_FIELDS])
+
+
+class RadicadoRepository:
+    """Radicados PQR con índices por radicado, documento, email y fecha."""
+
+    COLUMNS = RADICADO_FIELDS + ["estado"]
+    _INSERT = (f"INSERT INTO radicados ({', '.join(RADICADO_FIELDS)}) "
+               f"VALUES ({', '.join('?' for _ in RADICADO_FIELDS)})")
+
+    def __init__(self, path: str = DB_FILE, legacy_xlsx: str = None):
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        columns = ", ".join(f"{c} TEXT" for c in FORM_FIELDS)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS radicados ("
+                " radicado TEXT PRIMARY KEY,"
+                " fecha TEXT NOT NULL,"
+                f" {columns},"
+                f" estado TEXT NOT NULL DEFAULT '{ESTADO_INICIAL}')"
+            )
+            for col in ("documento", "email", "fecha"):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_radicados_{col} ON radicados ({col})")
+        if legacy_xlsx:
+            self.import_xlsx(legacy_xlsx)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM radicados").fetchone()[0]
+
+    def create(self, form: dict, max_attempts: int = 5) -> str:
+        """Inserta el formulario en una transacción y devuelve el radicado.
+
+        Si el ID generado ya existe se genera otro (la clave primaria
+        garantiza la unicidad).
+        """
+        for _ in range(max_attempts):
+            now = datetime.now()
+            rid = new_radicado_id(now)
+            try:
+                with self.lock, self.conn:
+                    self.conn.execute(self._INSERT, radicado_row(rid, now, form))
+                return rid
+            except sqlite3.IntegrityError:
+                continue
+        raise RuntimeError("No se pudo generar un radicado único")
+
+    def insert_many(self, rows) -> list:
+        """Inserta filas ya numeradas (ver radicado_row) en una transacción.
+
+        Devuelve las filas cuyo radicado ya existía; esas no se insertan.
+        """
+        rows = list(rows)
+        try:
+            with self.lock, self.conn:
+                self.conn.executemany(self._INSERT, rows)
+            return []
+        except sqlite3.IntegrityError:
+            pass
+        # Hubo un choque de IDs (se revirtió el lote): se inserta fila por fila
+        duplicated = []
+        with self.lock, self.conn:
+            for row in rows:
+                try:
+                    self.conn.execute(self._INSERT, row)
+                except sqlite3.IntegrityError:
+                    duplicated.append(row)
+        return duplicated
+
+    def _select(self, where, params):
+        with self.lock:
+            cur = self.conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM radicados WHERE {where} ORDER BY fecha",
+                params)
+            return [dict(zip(self.COLUMNS, row)) for row in cur.fetchall()]
+
+    def get(self, radicado: str):
+        rows = self._select("radicado = ?", (radicado.strip().upper(),))
+        return rows[0] if rows else None
+
+    def find_by_documento(self, documento: str) -> list:
+        return self._select("documento = ?", (documento,))
+
+    def find_by_email(self, email: str) -> list:
+        return self._select("email = ?", (email,))
+
+    def find_by_fecha(self, desde: str, hasta: str) -> list:
+        """Radicados con fecha en [desde, hasta] (texto 'YYYY-MM-DD ...')."""
+        return self._select("fecha BETWEEN ? AND ?", (desde, hasta))
+
+    def set_estado(self, radicado: str, estado: str) -> bool:
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                "UPDATE radicados SET estado = ? WHERE radicado = ?", (estado, radicado))
+        return cur.rowcount > 0
+
+    def import_xlsx(self, path: str) -> int:
+        """Migra radicados_pqr.xlsx si la tabla aún está vacía."""
+        if not os.path.exists(path) or len(self):
+            return 0
+        import pandas as pd
+        df = pd.read_excel(path, dtype=str)
+        if "radicado" not in df.columns:
+            raise ValueError(f"{path} no tiene la columna 'radicado'")
+        rows = _to_rows(df, RADICADO_FIELDS)
+        placeholders = ", ".join("?" for _ in RADICADO_FIELDS)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO radicados ({', '.join(RADICADO_FIELDS)}) VALUES ({placeholders})",
+                rows)
+        return len(rows)
+
+    def to_frame(self) -> "pd.DataFrame":
+        import pandas as pd
+        with self.lock:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(self.COLUMNS)} FROM radicados ORDER BY fecha", self.conn)
+
+    def export_xlsx(self, path: str = EXCEL_FILE_RADICADOS) -> int:
+        df = self.to_frame()
+        tmp = path + ".tmp.xlsx"
+        df.to_excel(tmp, index=False)
+        os.replace(tmp, path)
+        return len(df)
+
+
+# ------------------------------
+# Línea de comandos
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persistencia del Chatbot PQR")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Exporta la base a Excel")
+    export.add_argument("--db", default=DB_FILE)
+    export.add_argument("--interacciones", default=EXCEL_FILE_INTERACCIONES)
+    export.add_argument("--radicados", default=EXCEL_FILE_RADICADOS)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        n = InteractionLog(args.db).export_xlsx(args.interacciones)
+        print(f"{n} interacciones -> {args.interacciones}")
+        n = RadicadoRepository(args.db).export_xlsx(args.radicados)
+        print(f"{n} radicados -> {args.radicados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# ==============================================
+# Escritor único en segundo plano para el Chatbot PQR
+# ==============================================
+# Las sesiones del chat solo encolan: un hilo por proceso junta las
+# interacciones y radicados pendientes y los graba en chatbot_store (una
+# transacción por tabla) cada FLUSH_MS milisegundos o al llegar a
+# BATCH_SIZE registros, lo que ocurra primero. La latencia del mensaje no
+# incluye disco ni esperas por el bloqueo de SQLite.
+#
+# Los contadores de chatbot_analytics.py viajan por la misma cola: los
+# deltas del lote se suman en memoria y se graban en una sola transacción.
+#
+# El radicado se numera al encolar (el usuario lo ve de inmediato) y se puede
+# consultar aunque todavía no esté escrito. Si la base sigue bloqueada tras
+# WRITE_ATTEMPTS intentos, los registros se reintentan con el lote siguiente
+# (el radicado sigue consultable). Cualquier otro error descarta solo los
+# registros afectados: se registran en el log y en ``dead_letters``, y el
+# hilo sigue atendiendo la cola. flush() solo confirma cuando lo encolado
+# antes quedó grabado; save_radicado(wait=...) avisa si el radicado se
+# perdió. Al cerrar el proceso (atexit) se graba lo pendiente.
+#
+# Variables de entorno: CHATBOT_FLUSH_MS (200), CHATBOT_BATCH_SIZE (100).
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from chatbot_analytics import MetricsStore
+from chatbot_store import (DB_FILE, ESTADO_INICIAL, RADICADO_FIELDS, TIMESTAMP_FORMAT,
+                           InteractionLog, RadicadoRepository, new_radicado_id, radicado_row)
+
+FLUSH_MS = int(os.environ.get("CHATBOT_FLUSH_MS", "200"))
+BATCH_SIZE = int(os.environ.get("CHATBOT_BATCH_SIZE", "100"))
+# Reintentos si otro proceso mantiene bloqueada la base (cada intento ya
+# espera hasta el timeout de connect)
+WRITE_ATTEMPTS = 3
+# Registros descartados que se conservan en memoria para diagnóstico
+DEAD_LETTERS = 1000
+
+log = logging.getLogger(__name__)
+
+_STOP = "stop"
+_FLUSH = "flush"
+_INTERACTION = "interaccion"
+_RADICADO = "radicado"
+_METRICS = "metricas"
+_DATA = (_INTERACTION, _RADICADO, _METRICS)
+
+
+class PersistenceError(RuntimeError):
+    """Un registro no se pudo grabar y se descartó."""
+
+
+class _FlushRequest:
+    """Espera de flush(); ``lost`` es el total de descartes al pedirla."""
+
+    def __init__(self, lost: int):
+        self.lost = lost
+        self.ok = False
+        self.done = threading.Event()
+
+
+class PersistenceQueue:
+    """Cola de escrituras del chat con un solo hilo escritor por proceso."""
+
+    def __init__(self, path: str = DB_FILE, flush_ms: int = FLUSH_MS,
+                 batch_size: int = BATCH_SIZE, legacy_interacciones: str = None,
+                 legacy_radicados: str = None):
+        self.interactions = InteractionLog(path, legacy_xlsx=legacy_interacciones)
+        self.radicados = RadicadoRepository(path, legacy_xlsx=legacy_radicados)
+        self.metrics = MetricsStore(path)
+        self.flush_s = flush_ms / 1000
+        self.batch_size = batch_size
+        self.batches = 0
+        self.written = 0
+        # Registros descartados por errores no recuperables
+        self.lost = 0
+        self.dead_letters = deque(maxlen=DEAD_LETTERS)
+        self._queue = queue.Queue()
+        # Radicados encolados y aún no escritos (para consultarlos ya) y los
+        # que se descartaron
+        self._pending = {}
+        self._lost_radicados = set()
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="chatbot-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------
+    # API de las sesiones (no toca disco)
+    # ------------------------------
+    def save_interaction(self, user_msg: str, bot_response: str, session: str = None) -> None:
+        ts = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self._put(_INTERACTION, (ts, user_msg, bot_response, session))
+
+    def save_radicado(self, form: dict, wait: float = None) -> str:
+        """Numera el radicado, lo encola y devuelve el número.
+
+        Con ``wait`` (segundos) espera a que se grabe y lanza PersistenceError
+        si se descartó. Si se agota la espera porque la base sigue bloqueada
+        el radicado queda en cola (se reintenta) y se devuelve igual.
+        """
+        now = datetime.now()
+        rid = new_radicado_id(now)
+        row = radicado_row(rid, now, form)
+        with self._pending_lock:
+            self._pending[rid] = row
+        self._put(_RADICADO, row)
+        if wait is not None:
+            self.flush(timeout=wait)
+            with self._pending_lock:
+                lost = rid in self._lost_radicados
+            if lost:
+                raise PersistenceError(f"No se pudo grabar el radicado {rid}")
+        return rid
+
+    def record(self, deltas: dict) -> None:
+        """Encola deltas de contadores (ver chatbot_analytics)."""
+        if deltas:
+            self._put(_METRICS, dict(deltas))
+
+    def get_radicado(self, radicado: str):
+        radicado = radicado.strip().upper()
+        with self._pending_lock:
+            row = self._pending.get(radicado)
+        if row is not None:
+            return {**dict(zip(RADICADO_FIELDS, row)), "estado": ESTADO_INICIAL}
+        return self.radicados.get(radicado)
+
+    def session_turns(self, session: str, limit: int, skip_recent: int = 0) -> list:
+        """Turnos ya guardados de una sesión (graba antes lo que esté en cola)."""
+        if self.pending():
+            self.flush(timeout=5)
+        return self.interactions.session_turns(session, limit, skip_recent)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que se grabe todo lo encolado hasta ahora.
+
+        False si se agotó la espera o si algo de lo encolado se descartó.
+        """
+        if self._closed:
+            return True
+        request = _FlushRequest(self.lost)
+        self._queue.put((_FLUSH, request))
+        return request.done.wait(timeout) and request.ok
+
+    def close(self, timeout: float = 30) -> None:
+        """Graba lo pendiente y detiene el hilo (se llama también al salir)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+
+    def _put(self, kind, payload):
+        if self._closed:
+            # Ya no hay hilo escritor: se graba en la misma llamada
+            retry = self._safe_write([(kind, payload)])
+            if retry:
+                self._discard(retry)
+        else:
+            self._queue.put((kind, payload))
+
+    # ------------------------------
+    # Hilo escritor
+    # ------------------------------
+    def _run(self):
+        # Registros por reintentar (base bloqueada) y flush() que esperan por ellos
+        retry, waiting = [], []
+        while True:
+            batch, events, stop = retry, waiting, False
+            retry, waiting = [], []
+            try:
+                # Con reintentos pendientes no se espera indefinidamente
+                item = self._queue.get(timeout=self.flush_s if batch else None)
+            except queue.Empty:
+                item = None
+            deadline = time.monotonic() + self.flush_s
+            while item is not None:
+                kind, payload = item
+                if kind == _STOP:
+                    stop = True
+                    break
+                if kind == _FLUSH:
+                    events.append(payload)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if stop:
+                # Lo que otro hilo alcanzó a encolar junto con el cierre
+                while True:
+                    try:
+                        kind, payload = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == _FLUSH:
+                        events.append(payload)
+                    elif kind in _DATA:
+                        batch.append((kind, payload))
+            retry = self._safe_write(batch)
+            if stop and retry:
+                log.error("Se cierra sin grabar %d registros", len(retry))
+                self._discard(retry)
+                retry = []
+            if retry:
+                # Se confirman cuando se graben los reintentos
+                waiting = events
+            else:
+                for request in events:
+                    request.ok = self.lost == request.lost
+                    request.done.set()
+            if stop:
+                return
+
+    def _safe_write(self, batch) -> list:
+        """_write sin dejar morir al hilo; devuelve lo que hay que reintentar."""
+        if not batch:
+            return []
+        try:
+            retry, lost = self._write(batch)
+        except Exception:
+            log.exception("Error inesperado al grabar un lote de %d registros", len(batch))
+            retry, lost = [], batch
+        if lost:
+            self._discard(lost)
+        return retry
+
+    def _discard(self, items) -> None:
+        with self._pending_lock:
+            for kind, payload in items:
+                if kind == _RADICADO:
+                    self._pending.pop(payload[0], None)
+                    self._lost_radicados.add(payload[0])
+            self.dead_letters.extend(items)
+            self.lost += len(items)
+
+    def _write(self, batch) -> tuple:
+        """Graba el lote con una transacción por tabla.
+
+        Devuelve (reintentar, descartados): lo que no se grabó porque la base
+        siguió bloqueada y lo que falló por otro error (no se reintenta).
+        """
+        metrics = Counter()
+        for kind, payload in batch:
+            if kind == _METRICS:
+                metrics.update(payload)
+        groups = [
+            (_INTERACTION, [p for k, p in batch if k == _INTERACTION],
+             self.interactions.append_many),
+            (_RADICADO, [p for k, p in batch if k == _RADICADO], self._insert_radicados),
+            (_METRICS, [dict(metrics)] if metrics else [],
+             lambda rows: self.metrics.add(rows[0])),
+        ]
+        retry, lost = [], []
+        for kind, rows, write in groups:
+            if not rows:
+                continue
+            for attempt in range(WRITE_ATTEMPTS):
+                try:
+                    lost += [(kind, row) for row in write(rows) or []]
+                    break
+                except sqlite3.OperationalError:
+                    if attempt == WRITE_ATTEMPTS - 1:
+                        log.exception("No se pudieron grabar %d registros (%s);"
+                                      " se reintentarán", len(rows), kind)
+                        retry += [(kind, row) for row in rows]
+                    else:
+                        time.sleep(0.1 * 2 ** attempt)
+                except Exception:
+                    log.exception("Error al grabar %d registros (%s); se descartan",
+                                  len(rows), kind)
+                    lost += [(kind, row) for row in rows]
+                    break
+        # Los radicados por reintentar siguen en _pending; los descartados
+        # los saca _discard
+        retrying = {row[0] for kind, row in retry if kind == _RADICADO}
+        with self._pending_lock:
+            for kind, payload in batch:
+                if kind == _RADICADO and payload[0] not in retrying:
+                    self._pending.pop(payload[0], None)
+        self.batches += 1
+        self.written += sum(1 for kind, _ in batch if kind != _METRICS) \
+            - sum(1 for kind, _ in retry + lost if kind != _METRICS)
+        return retry, lost
+
+    def _insert_radicados(self, rows) -> list:
+        """Inserta los radicados; devuelve las filas que no se pudieron guardar."""
+        lost = []
+        for row in self.radicados.insert_many(rows):
+            stored = self.radicados.get(row[0])
+            if stored and all(stored[f] == v for f, v in zip(RADICADO_FIELDS, row)):
+                # Ya grabado por un intento anterior del mismo lote
+                continue
+            try:
+                # Choque de IDs con otro proceso: se guarda con uno nuevo
+                rid = self.radicados.create(dict(zip(RADICADO_FIELDS, row)))
+            except RuntimeError:
+                log.exception("Radicado %s duplicado y sin ID libre", row[0])
+                lost.append(row)
+                continue
+            log.warning("Radicado %s duplicado; guardado como %s", row[0], rid)
+        return lost
@@ -0,0 +1,188 @@
+# ==============================================
+# Índice de FAQ para el Chatbot PQR
+# ==============================================
+# El vectorizador TF-IDF y la matriz de preguntas se construyen fuera de
+# línea y se guardan en disco:
+#
+#   py Entrega1_MA/faq_index.py build Entrega1_MA/faq_pqr.csv
+#
+# Cada construcción escribe en su propia carpeta (build-*) y al final
+# reemplaza el manifiesto faq.json con os.replace: un lector nunca ve un
+# índice a medio escribir. Si el manifiesto apunta a una construcción que no
+# se puede abrir, load_or_build la rehace.
+#
+# Al arrancar, la matriz CSR se abre con memory-map (np.load mmap_mode="r")
+# y cada consulta es un producto matriz-vector disperso + argpartition.
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+FAQ_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "faq_pqr.csv")
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "faq_index")
+FAQ_OPTIONS = {"sep": ";", "encoding": "utf-8"}
+
+_ARRAYS = ("data", "indices", "indptr")
+MANIFEST = "faq.json"
+
+
+def read_faq(path: str = FAQ_FILE) -> pd.DataFrame:
+    """Lee el archivo de FAQ (columnas pregunta;respuesta)."""
+    faq = pd.read_csv(path, **FAQ_OPTIONS).dropna(subset=["pregunta", "respuesta"])
+    return faq[["pregunta", "respuesta"]].reset_index(drop=True)
+
+
+def build_index(faq_path: str = FAQ_FILE, index_dir: str = INDEX_DIR) -> int:
+    """Ajusta el TF-IDF sobre las preguntas y guarda vectorizador y matriz.
+
+    Publica el índice reemplazando el manifiesto; las construcciones
+    anteriores se borran (un proceso que las tenga abiertas con mmap sigue
+    leyendo sus archivos).
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    faq = read_faq(faq_path)
+    vec = TfidfVectorizer()
+    # Filas normalizadas L2: el producto punto es la similitud coseno
+    matrix = vec.fit_transform(faq["pregunta"]).tocsr().astype(np.float32)
+
+    os.makedirs(index_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix="build-", dir=index_dir)
+    joblib.dump(vec, os.path.join(build_dir, "vectorizer.joblib"))
+    for name in _ARRAYS:
+        np.save(os.path.join(build_dir, f"{name}.npy"), getattr(matrix, name))
+    info = os.stat(faq_path)
+    manifest = os.path.join(index_dir, MANIFEST)
+    tmp = f"{manifest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({
+            "build": os.path.basename(build_dir),
+            "source": {"mtime_ns": info.st_mtime_ns, "size": info.st_size},
+            "shape": list(matrix.shape),
+            "preguntas": faq["pregunta"].tolist(),
+            "respuestas": faq["respuesta"].tolist(),
+        }, fh, ensure_ascii=False)
+    os.replace(tmp, manifest)
+    _remove_old_builds(index_dir, keep=os.path.basename(build_dir))
+    return len(faq)
+
+
+def _remove_old_builds(index_dir: str, keep: str) -> None:
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name.startswith("build-") and name != keep:
+            # En Windows un archivo con mmap abierto no se puede borrar
+            shutil.rmtree(path, ignore_errors=True)
+        elif name == "vectorizer.joblib" or name.endswith(".npy"):
+            # Formato anterior (todo en la raíz del índice)
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def read_manifest(index_dir: str = INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, MANIFEST), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def index_is_fresh(faq_path: str = FAQ_FILE, index_dir: str = INDEX_DIR) -> bool:
+    meta = read_manifest(index_dir)
+    if not meta or "build" not in meta:
+        return False
+    info = os.stat(faq_path)
+    return meta.get("source") == {"mtime_ns": info.st_mtime_ns, "size": info.st_size}
+
+
+class FaqIndex:
+    """Búsqueda top-k por similitud coseno sobre el índice persistido."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        with open(os.path.join(index_dir, MANIFEST), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        build_dir = os.path.join(index_dir, meta["build"])
+        self.questions = meta["preguntas"]
+        self.answers = meta["respuestas"]
+        self.vectorizer = joblib.load(os.path.join(build_dir, "vectorizer.joblib"))
+        data, indices, indptr = (np.load(os.path.join(build_dir, f"{name}.npy"), mmap_mode="r")
+                                 for name in _ARRAYS)
+        self.matrix = sparse.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+
+    @classmethod
+    def load_or_build(cls, faq_path: str = FAQ_FILE, index_dir: str = INDEX_DIR) -> "FaqIndex":
+        """Carga el índice; lo reconstruye si falta, si cambió el archivo de FAQ
+        o si la construcción publicada no se puede abrir."""
+        if index_is_fresh(faq_path, index_dir):
+            try:
+                return cls(index_dir)
+            except (OSError, ValueError, KeyError):
+                pass
+        build_index(faq_path, index_dir)
+        return cls(index_dir)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _top_k(self, scores, k):
+        k = min(k, scores.shape[-1])
+        if k <= 0:
+            return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+        idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+        order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1, kind="stable")
+        return np.take_along_axis(idx, order, axis=-1)
+
+    def search_batch(self, messages: list, k: int = 1) -> list:
+        """Top-k por mensaje: lista de listas [(índice, similitud), ...]."""
+        if not messages:
+            return []
+        queries = self.vectorizer.transform(messages)
+        scores = np.asarray((queries @ self.matrix.T).todense(), dtype=np.float32)
+        idx = self._top_k(scores, k)
+        sims = np.take_along_axis(scores, idx, axis=-1)
+        return [list(zip(row_idx.tolist(), row_sim.tolist())) for row_idx, row_sim in zip(idx, sims)]
+
+    def search(self, message: str, k: int = 1) -> list:
+        return self.search_batch([message], k)[0]
+
+    def match(self, message: str):
+        """(índice, similitud) de la FAQ más parecida, o None si no hay con qué comparar."""
+        if not message.strip() or not len(self):
+            return None
+        hits = self.search(message, k=1)
+        return hits[0] if hits else None
+
+    def answer(self, message: str, threshold: float = 0.35):
+        """Respuesta de la FAQ más parecida, o None si no supera el umbral."""
+        hit = self.match(message)
+        if hit is None or hit[1] < threshold:
+            return None
+        return self.answers[hit[0]]
+
+
+# ------------------------------
+# Línea de comandos
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice de FAQ del Chatbot PQR")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Construye el índice a partir del archivo de FAQ")
+    build.add_argument("faq", nargs="?", default=FAQ_FILE)
+    build.add_argument("--out", default=INDEX_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        n = build_index(args.faq, args.out)
+        print(f"{n} preguntas indexadas -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
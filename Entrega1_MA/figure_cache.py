@@ -0,0 +1,107 @@
+# ==============================================
+# Caché LRU de figuras Plotly ya construidas
+# ==============================================
+# Las figuras se guardan serializadas (JSON) por (versión de las figuras,
+# slide, año, versión de datos), ver figure_key en superstore_story.py.
+# Volver a un slide/año ya visto no repite el groupby ni px.*.
+#
+# Con ``folder`` el JSON también se escribe en disco: lo comparten los
+# procesos (workers de Streamlit, warmup.py) y sobrevive a reinicios.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import plotly
+import plotly.io as pio
+
+DEFAULT_MAXSIZE = 64
+FIGURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "figures")
+# Archivos que se conservan en disco (los más antiguos se borran)
+MAX_DISK_ITEMS = 512
+
+
+class FigureCache:
+    """LRU de figuras en JSON, segura entre los hilos de las sesiones."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, folder: str = None,
+                 max_disk_items: int = MAX_DISK_ITEMS):
+        self.maxsize = maxsize
+        self.folder = folder
+        self.max_disk_items = max_disk_items
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _path(self, key):
+        # El JSON depende también de la versión de plotly que lo serializó
+        name = hashlib.sha256(repr((plotly.__version__, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, name + ".json")
+
+    def get_json(self, key):
+        with self._lock:
+            fig_json = self._items.get(key)
+            if fig_json is not None:
+                self._items.move_to_end(key)
+                return fig_json
+        if self.folder is None:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as fh:
+                fig_json = fh.read()
+        except OSError:
+            return None
+        self._remember(key, fig_json)
+        return fig_json
+
+    def _remember(self, key, fig_json):
+        with self._lock:
+            self._items[key] = fig_json
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def put_json(self, key, fig_json: str) -> None:
+        self._remember(key, fig_json)
+        if self.folder is None:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(fig_json)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith(".json"):
+                try:
+                    entries.append((os.path.getmtime(os.path.join(self.folder, name)), name))
+                except OSError:
+                    continue
+        for _, name in sorted(entries)[:max(0, len(entries) - self.max_disk_items)]:
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except OSError:
+                pass
+
+    def get_or_build(self, key, build):
+        """Figura para ``key``; ``build()`` solo se llama si no está en caché."""
+        fig_json = self.get_json(key)
+        if fig_json is not None:
+            self.hits += 1
+            return pio.from_json(fig_json, skip_invalid=True)
+        self.misses += 1
+        fig = build()
+        self.put_json(key, fig.to_json())
+        return fig
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
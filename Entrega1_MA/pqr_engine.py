@@ -0,0 +1,127 @@
+# ==============================================
+# Motor de conversación PQR (sin Streamlit)
+# ==============================================
+# El flujo del chat es una tabla de transiciones: cada paso indica qué
+# validador aplica, en qué campo del formulario guarda la respuesta, qué
+# mensaje devuelve y cuál es el siguiente paso. El motor recibe el estado
+# de la sesión de forma explícita ({"step": ..., "form": {...}}), así que
+# se puede ejecutar y medir fuera de Streamlit (ver bench_pqr_engine.py).
+import re
+from typing import Callable, NamedTuple, Optional
+
+WELCOME = "¡Hola! Soy tu asistente de PQR.\nEscribe P, Q, R o S para empezar."
+RESET_WORDS = {"reiniciar", "reset", "/reset"}
+
+# Regex validaciones
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_RE = re.compile(r"^[+\d][\d\s-]{6,}$")
+DOC_RE = re.compile(r"^[A-Za-z0-9.-]{4,}$")
+RADICADO_RE = re.compile(r"PQR-\d{14}-[A-Z0-9]{6}", re.IGNORECASE)
+TIPOS_VALIDOS = {"p":"Petición","peticion":"Petición",
+                 "q":"Queja","queja":"Queja",
+                 "r":"Reclamo","reclamo":"Reclamo",
+                 "s":"Sugerencia","sugerencia":"Sugerencia"}
+
+def is_valid_email(x): return bool(EMAIL_RE.match(x or ""))
+def is_valid_phone(x): return bool(PHONE_RE.match(x or ""))
+def is_valid_doc(x): return bool(DOC_RE.match(x or ""))
+
+
+def _check(validator):
+    """Convierte un validador booleano en un parser (texto o None)."""
+    return lambda txt: txt if validator(txt) else None
+
+
+class Step(NamedTuple):
+    next: str
+    # Plantilla de respuesta: recibe {form}, los campos del formulario y {radicado}
+    reply: str
+    field: Optional[str] = None
+    # parse(texto) -> valor a guardar, o None si la entrada no es válida
+    parse: Callable = lambda txt: txt
+    error: str = ""
+    faq_on_error: bool = False
+    submit: bool = False
+
+
+STEPS = {
+    "welcome": Step("nombre", "Tipo {tipo}. Tu nombre completo?", field="tipo",
+                    parse=lambda txt: TIPOS_VALIDOS.get(txt.lower()),
+                    error="Indica el tipo: P,Q,R o S.", faq_on_error=True),
+    "nombre": Step("documento", "Número de documento?", field="nombre"),
+    "documento": Step("email", "Correo electrónico?", field="documento",
+                      parse=_check(is_valid_doc), error="Documento no válido. Ingresa de nuevo:"),
+    "email": Step("telefono", "Teléfono de contacto?", field="email",
+                  parse=_check(is_valid_email), error="Email inválido. Intenta otra vez:"),
+    "telefono": Step("departamento", "Departamento?", field="telefono",
+                     parse=_check(is_valid_phone), error="Teléfono inválido. Intenta de nuevo:"),
+    "departamento": Step("municipio", "Municipio?", field="departamento"),
+    "municipio": Step("canal", "¿Prefieres respuesta por correo o teléfono?", field="municipio"),
+    "canal": Step("descripcion", "Describe tu caso brevemente.", field="canal"),
+    "descripcion": Step("autorizo", "¿Autorizas uso de datos (sí/no)?", field="descripcion"),
+    "autorizo": Step("confirmar",
+                     "Gracias. Confirma para radicar:\n{form}\nEscribe 'confirmar' o 'reiniciar'.",
+                     field="autorizo"),
+    "confirmar": Step("welcome", "✅ Radicado generado: {radicado}",
+                      parse=lambda txt: txt if txt.lower().startswith("confirmar") else None,
+                      error="Debes escribir 'confirmar' para finalizar o 'reiniciar'.",
+                      submit=True),
+}
+
+
+def new_state() -> dict:
+    return {"step": "welcome", "form": {}}
+
+
+class PQREngine:
+    """Procesa mensajes sobre un estado de sesión explícito.
+
+    retrieve_faq(msg) -> respuesta o None, submit(form) -> radicado y
+    lookup(radicado) -> texto son inyectados por quien use el motor.
+    """
+
+    def __init__(self, retrieve_faq=None, submit=None, lookup=None, steps=STEPS):
+        self.retrieve_faq = retrieve_faq or (lambda msg: None)
+        self.submit = submit
+        self.lookup = lookup
+        self.steps = steps
+
+    def handle(self, state: dict, user_msg: str) -> str:
+        txt = user_msg or ""
+        low = txt.lower()
+
+        if low in RESET_WORDS:
+            state.update(new_state())
+            return "Reiniciado. " + WELCOME
+
+        # Consulta de estado: en la bienvenida basta el número; a mitad del
+        # formulario hay que pedirla ("estado PQR-...") para que un campo que
+        # cite otro radicado (p. ej. la descripción) se guarde como respuesta.
+        # No altera el paso actual.
+        if self.lookup and (state["step"] == "welcome" or low.startswith("estado")) \
+                and (m := RADICADO_RE.search(txt)):
+            return self.lookup(m.group(0))
+
+        step = self.steps.get(state["step"])
+        if step is None:
+            return "No entendí."
+
+        value = step.parse(txt)
+        if value is None:
+            if step.faq_on_error:
+                faq = self.retrieve_faq(txt)
+                return (faq + "\n\n" if faq else "") + step.error
+            return step.error
+
+        form = state["form"]
+        if step.field:
+            form[step.field] = value
+        radicado = None
+        if step.submit:
+            radicado = self.submit(form)
+            state.update(new_state())
+        else:
+            state["step"] = step.next
+        if "{" not in step.reply:
+            return step.reply
+        return step.reply.format(form=form, radicado=radicado, **form)
@@ -0,0 +1,13 @@
+# ==============================================
+# Módulos compartidos de la raíz del repo
+# ==============================================
+# chart_prep, lazy_imports y perf_trace viven en la raíz porque también los
+# usan los Ejemplo_*. `streamlit run Entrega1_MA/<app>.py` solo agrega a
+# sys.path la carpeta del script; importar este módulo primero agrega la raíz
+# (al final, para que no tape a los módulos de Entrega1_MA).
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
@@ -0,0 +1,262 @@
+# ==============================================
+# Motores de consulta para las historias Superstore
+# ==============================================
+# Las historias solo hacen tres consultas: años disponibles, Sales/Profit
+# por una dimensión (opcionalmente de un año) y días promedio de entrega por
+# fecha. Aquí esas consultas se resuelven con uno de tres motores:
+#
+#   pandas   carga el archivo (caché Parquet) y arma el RollupCube en memoria
+#   duckdb   SQL directo sobre el CSV o Parquet
+#   polars   LazyFrame sobre el CSV o Parquet
+#
+# Se elige con la variable de entorno SUPERSTORE_BACKEND (por defecto
+# pandas). Con duckdb y polars cada consulta lee solo las columnas que usa
+# (p. ej. Region, Sales, Profit y Order Date) y el filtro de año se pasa
+# como rango de Order Date, que en Parquet descarta row groups completos.
+# Si el motor elegido no está instalado se usa pandas.
+#
+# Con pandas y un CSV el cubo se refresca de forma incremental
+# (superstore_incremental.py): solo se parsean las filas agregadas desde la
+# última vez. SUPERSTORE_INCREMENTAL=0 vuelve a la carga completa.
+#
+# El lector CSV de DuckDB no acepta los bytes 0x80-0x9F que trae el archivo
+# (comillas de Windows); la primera vez se hace una copia UTF-8 en .cache
+# (lectura por bloques, sin parsear) y las consultas leen esa copia.
+import json
+import os
+import shutil
+import threading
+import warnings
+from datetime import date
+from typing import Optional, Protocol
+
+import pandas as pd
+
+from superstore_data import CACHE_DIR, CSV_OPTIONS, DATE_FORMAT, load_superstore, source_signature
+from superstore_cube import DIMENSIONS, RollupCube
+from superstore_incremental import IncrementalRollup
+
+BACKENDS = ("pandas", "duckdb", "polars")
+DEFAULT_BACKEND = os.environ.get("SUPERSTORE_BACKEND", "pandas").lower()
+INCREMENTAL = os.environ.get("SUPERSTORE_INCREMENTAL", "1") != "0"
+# Dimensiones que se pueden agrupar directamente desde el archivo
+QUERY_DIMENSIONS = [d for d in DIMENSIONS if d != "Order Date"]
+PARQUET_COLUMNS = ["Category", "Segment", "Region", "Order Date", "Ship Date", "Sales", "Profit"]
+
+
+class StorySource(Protocol):
+    """Lo que necesitan las historias (RollupCube ya lo cumple)."""
+
+    def years(self) -> list: ...
+
+    def totals_by(self, dimension: str, year=None) -> pd.DataFrame: ...
+
+    def delivery_trend(self, year=None) -> pd.DataFrame: ...
+
+
+def _check_dimension(dimension: str) -> None:
+    # Los nombres van dentro del SQL: solo se aceptan columnas conocidas
+    if dimension not in QUERY_DIMENSIONS:
+        raise ValueError(f"Dimensión no soportada: {dimension!r}")
+
+
+def _year_range(year) -> tuple:
+    return date(int(year), 1, 1), date(int(year) + 1, 1, 1)
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(".parquet")
+
+
+def utf8_copy(path: str) -> str:
+    """Copia UTF-8 del CSV junto a la caché Parquet; se rehace si cambia la firma."""
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    out = os.path.join(folder, os.path.splitext(os.path.basename(path))[0] + ".utf8.csv")
+    stamp = out + ".json"
+    signature = list(source_signature(path))
+    try:
+        with open(stamp, encoding="utf-8") as fh:
+            if json.load(fh) == signature and os.path.exists(out):
+                return out
+    except (OSError, ValueError):
+        pass
+    os.makedirs(folder, exist_ok=True)
+    tmp = out + ".tmp"
+    with open(path, encoding=CSV_OPTIONS["encoding"], newline="") as src, \
+            open(tmp, "w", encoding="utf-8", newline="") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp, out)
+    with open(stamp, "w", encoding="utf-8") as fh:
+        json.dump(signature, fh)
+    return out
+
+
+# ---------------------------
+# DuckDB
+# ---------------------------
+class DuckDBSource:
+    """Consultas SQL sobre el archivo; DuckDB solo lee las columnas usadas."""
+
+    def __init__(self, path: str):
+        import duckdb
+
+        self.path = path
+        self._con = duckdb.connect()
+        self._lock = threading.Lock()
+        if _is_parquet(path):
+            # Parquet tipado (caché de superstore_data o superstore_synth)
+            relation = (f"""SELECT "Category", "Segment", "Region", "Sales", "Profit",
+                                   CAST("Order Date" AS DATE) AS "Order Date",
+                                   CAST("Ship Date" AS DATE) AS "Ship Date"
+                            FROM read_parquet({self._literal(path)})""")
+        else:
+            csv_path = utf8_copy(path)
+            # Todo como texto y sin detección de formato (se haría en cada consulta)
+            with open(csv_path, encoding="utf-8") as fh:
+                header = fh.readline().rstrip("\r\n").split(CSV_OPTIONS["sep"])
+            columns = "{" + ", ".join(f"{self._literal(c)}: 'VARCHAR'" for c in header) + "}"
+            relation = (f"""SELECT "Category", "Segment", "Region",
+                                   TRY_CAST("Sales" AS DOUBLE) AS "Sales",
+                                   TRY_CAST("Profit" AS DOUBLE) AS "Profit",
+                                   CAST(strptime("Order Date", '{DATE_FORMAT}') AS DATE) AS "Order Date",
+                                   CAST(strptime("Ship Date", '{DATE_FORMAT}') AS DATE) AS "Ship Date"
+                            FROM read_csv({self._literal(csv_path)},
+                                          delim='{CSV_OPTIONS["sep"]}', header=true,
+                                          auto_detect=false, columns={columns})""")
+        # Vista: el optimizador empuja proyección y filtros hasta el lector
+        self._con.execute(f"CREATE VIEW superstore AS {relation}")
+
+    @staticmethod
+    def _literal(text: str) -> str:
+        return "'" + text.replace("'", "''") + "'"
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        # Una conexión hija por consulta: las sesiones de Streamlit son hilos
+        with self._lock:
+            cursor = self._con.cursor()
+        try:
+            return cursor.execute(sql, list(params)).df()
+        finally:
+            cursor.close()
+
+    def _where_year(self, year):
+        if year is None:
+            return "", ()
+        return 'WHERE "Order Date" >= ? AND "Order Date" < ?', _year_range(year)
+
+    def years(self) -> list:
+        df = self._query('SELECT DISTINCT year("Order Date") AS y FROM superstore '
+                         'WHERE "Order Date" IS NOT NULL ORDER BY y')
+        return df["y"].astype(int).tolist()
+
+    def totals_by(self, dimension: str, year=None) -> pd.DataFrame:
+        _check_dimension(dimension)
+        key = 'year("Order Date")' if dimension == "Year" else f'"{dimension}"'
+        where, params = self._where_year(year)
+        return self._query(
+            f'SELECT {key} AS "{dimension}", sum("Sales") AS "Sales", sum("Profit") AS "Profit" '
+            f'FROM superstore {where} GROUP BY 1 ORDER BY 1', params)
+
+    def delivery_trend(self, year=None) -> pd.DataFrame:
+        where, params = self._where_year(year)
+        df = self._query(
+            'SELECT "Order Date", avg(date_diff(\'day\', "Order Date", "Ship Date")) '
+            f'AS "Delivery Days" FROM superstore {where} GROUP BY 1 ORDER BY 1', params)
+        df["Order Date"] = pd.to_datetime(df["Order Date"])
+        return df
+
+
+# ---------------------------
+# Polars
+# ---------------------------
+class PolarsSource:
+    """LazyFrame sobre el archivo; collect() aplica proyección y filtros al leer."""
+
+    def __init__(self, path: str):
+        import polars as pl
+
+        self.path = path
+        self._pl = pl
+        if _is_parquet(path):
+            scan = pl.scan_parquet(path).with_columns(
+                pl.col("Order Date").cast(pl.Date), pl.col("Ship Date").cast(pl.Date))
+        else:
+            # Las columnas consultadas son ASCII: utf8-lossy basta con latin1
+            scan = pl.scan_csv(path, separator=CSV_OPTIONS["sep"], encoding="utf8-lossy",
+                               infer_schema=False).with_columns(
+                pl.col("Sales").cast(pl.Float64, strict=False),
+                pl.col("Profit").cast(pl.Float64, strict=False),
+                pl.col("Order Date").str.strptime(pl.Date, DATE_FORMAT, strict=False),
+                pl.col("Ship Date").str.strptime(pl.Date, DATE_FORMAT, strict=False),
+            )
+        self._scan = scan
+
+    def _frame(self, year):
+        pl = self._pl
+        if year is None:
+            return self._scan
+        start, end = _year_range(year)
+        return self._scan.filter((pl.col("Order Date") >= start) & (pl.col("Order Date") < end))
+
+    def years(self) -> list:
+        pl = self._pl
+        years = (self._scan.select(pl.col("Order Date").dt.year().alias("y"))
+                           .drop_nulls().unique().sort("y").collect())
+        return years["y"].to_list()
+
+    def totals_by(self, dimension: str, year=None) -> pd.DataFrame:
+        _check_dimension(dimension)
+        pl = self._pl
+        key = (pl.col("Order Date").dt.year() if dimension == "Year" else pl.col(dimension))
+        return (self._frame(year)
+                    .group_by(key.alias(dimension))
+                    .agg(pl.col("Sales").sum(), pl.col("Profit").sum())
+                    .sort(dimension)
+                    .collect()
+                    .to_pandas())
+
+    def delivery_trend(self, year=None) -> pd.DataFrame:
+        pl = self._pl
+        days = (pl.col("Ship Date") - pl.col("Order Date")).dt.total_days()
+        df = (self._frame(year)
+                  .group_by("Order Date")
+                  .agg(days.mean().alias("Delivery Days"))
+                  .sort("Order Date")
+                  .collect()
+                  .to_pandas())
+        df["Order Date"] = pd.to_datetime(df["Order Date"])
+        return df
+
+
+_SOURCES = {"duckdb": DuckDBSource, "polars": PolarsSource}
+
+
+def open_source(path: str, backend: Optional[str] = None) -> StorySource:
+    """Fuente de datos de las historias con el motor configurado.
+
+    Con pandas, los dos caminos del CSV parsean con el esquema compacto de
+    superstore_schema.py: los bloques de IncrementalRollup
+    (SUPERSTORE_INCREMENTAL=1, por defecto) y la caché Parquet de
+    load_superstore, que conserva esos tipos al releerla.
+    """
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"SUPERSTORE_BACKEND debe ser uno de {BACKENDS}, no {backend!r}")
+    if backend != "pandas":
+        try:
+            return _SOURCES[backend](path)
+        except ImportError:
+            warnings.warn(f"{backend} no está instalado; se usa pandas", RuntimeWarning)
+    if INCREMENTAL and not _is_parquet(path):
+        return IncrementalRollup(path).refresh()
+    return RollupCube.from_frame(_load_frame(path))
+
+
+def _load_frame(path: str) -> pd.DataFrame:
+    """DataFrame para el cubo de pandas (CSV vía la caché de superstore_data)."""
+    if not _is_parquet(path):
+        return load_superstore(path)
+    df = pd.read_parquet(path, columns=PARQUET_COLUMNS)
+    df["Delivery Days"] = (df["Ship Date"] - df["Order Date"]).dt.days
+    df["Year"] = df["Order Date"].dt.year
+    return df
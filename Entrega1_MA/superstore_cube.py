@@ -0,0 +1,80 @@
+# ==============================================
+# Cubo de agregados (rollup) para los slides Superstore
+# ==============================================
+# Se agrega una sola vez Sales, Profit, conteo y días de entrega sobre
+# Category × Segment × Region × Year × Order Date. Cada slide consulta el
+# cubo (filtro + suma) en lugar de recorrer las filas originales.
+#
+# Para que los promedios se puedan volver a agregar, los días de entrega se
+# guardan como suma y conteo; el promedio se calcula al consultar.
+import pandas as pd
+
+DIMENSIONS = ["Category", "Segment", "Region", "Year", "Order Date"]
+MEASURES = ["Sales", "Profit", "Orders", "Delivery Days Sum", "Delivery Days Count"]
+
+
+def rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrega las filas de pedidos al grano del cubo."""
+    return (df.groupby(DIMENSIONS, observed=True, sort=False)
+              .agg(**{
+                  "Sales": ("Sales", "sum"),
+                  "Profit": ("Profit", "sum"),
+                  "Orders": ("Sales", "size"),
+                  "Delivery Days Sum": ("Delivery Days", "sum"),
+                  "Delivery Days Count": ("Delivery Days", "count"),
+              })
+              .reset_index())
+
+
+class RollupCube:
+    """Agregados en memoria con dos niveles.
+
+    ``daily`` tiene el grano completo (incluye Order Date) y ``yearly`` lo
+    resume sin la fecha, que es lo que usan las barras y los pies.
+    """
+
+    def __init__(self, daily: pd.DataFrame):
+        self.daily = daily
+        self.yearly = (daily.groupby(DIMENSIONS[:-1], observed=True, sort=False)[MEASURES]
+                            .sum()
+                            .reset_index())
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RollupCube":
+        return cls(rollup(df))
+
+    def years(self) -> list:
+        return sorted(self.yearly["Year"].unique().tolist())
+
+    def totals_by(self, dimension: str, year=None) -> pd.DataFrame:
+        """Sales y Profit sumados por una dimensión, opcionalmente para un año."""
+        table = self.yearly
+        if year is not None:
+            table = table[table["Year"] == year]
+        return table.groupby(dimension, observed=True)[["Sales", "Profit"]].sum().reset_index()
+
+    def delivery_trend(self, year=None) -> pd.DataFrame:
+        """Días promedio de entrega por Order Date (de un año o de todos)."""
+        table = self.daily
+        if year is not None:
+            table = table[table["Year"] == year]
+        trend = (table.groupby("Order Date")[["Delivery Days Sum", "Delivery Days Count"]]
+                      .sum()
+                      .reset_index())
+        trend["Delivery Days"] = trend["Delivery Days Sum"] / trend["Delivery Days Count"]
+        return trend[["Order Date", "Delivery Days"]]
+
+
+# ---------------------------
+# Consultas de cada slide
+# ---------------------------
+def category_summary(cube: RollupCube) -> pd.DataFrame:
+    return cube.totals_by("Category")
+
+
+def segment_summary(cube: RollupCube) -> pd.DataFrame:
+    return cube.totals_by("Segment")
+
+
+def region_summary(cube: RollupCube, year=None) -> pd.DataFrame:
+    return cube.totals_by("Region", year).sort_values("Sales", ascending=True)
@@ -0,0 +1,129 @@
+# ==============================================
+# Carga de datos Superstore con caché columnar
+# ==============================================
+# El CSV original se convierte una sola vez a Parquet (fechas ya parseadas
+# y columnas derivadas "Delivery Days" y "Year"). Las ejecuciones
+# siguientes leen el Parquet; si cambia la fecha de modificación o el
+# contenido del CSV, la caché se reconstruye sola. Las columnas se leen con
+# el esquema compacto de superstore_schema.py (categorías, enteros angostos).
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from superstore_schema import compact, csv_dtypes
+
+CSV_OPTIONS = {"encoding": "latin1", "sep": ";"}
+DATE_FORMAT = "%m/%d/%Y"
+CACHE_DIR = ".cache"
+# Subir este número cuando cambie la transformación del CSV
+CACHE_VERSION = 2
+
+
+def source_signature(path: str) -> tuple:
+    """Firma barata del archivo fuente: (mtime en ns, tamaño en bytes)."""
+    info = os.stat(path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash SHA-256 del contenido, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_superstore_csv(path, **read_options) -> pd.DataFrame:
+    """Lee el CSV con el motor C y el esquema compacto, y agrega las derivadas.
+
+    ``path`` puede ser un buffer; ``read_options`` pasa a pd.read_csv (p. ej.
+    header=None y names=... para los bloques de superstore_incremental).
+    """
+    df = pd.read_csv(path, dtype=csv_dtypes(), **CSV_OPTIONS, **read_options)
+    return add_derived_columns(compact(df))
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Fechas parseadas, "Delivery Days" y "Year" sobre el CSV crudo."""
+    df["Order Date"] = pd.to_datetime(df["Order Date"], format=DATE_FORMAT)
+    df["Ship Date"] = pd.to_datetime(df["Ship Date"], format=DATE_FORMAT)
+    # Diferencia en días entre envío y pedido
+    # Enteros al ancho mínimo (si hay fechas vacías quedan en float)
+    df["Delivery Days"] = pd.to_numeric((df["Ship Date"] - df["Order Date"]).dt.days,
+                                        downcast="integer")
+    df["Year"] = pd.to_numeric(df["Order Date"].dt.year, downcast="integer")
+    return df
+
+
+def cache_paths(path: str) -> tuple:
+    """Rutas (parquet, metadatos) de la caché asociada a un CSV."""
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    base = os.path.splitext(os.path.basename(path))[0]
+    return (os.path.join(folder, base + ".parquet"),
+            os.path.join(folder, base + ".json"))
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, meta_path)
+
+
+def _cache_is_fresh(path, parquet_path, meta_path):
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("version") != CACHE_VERSION or not os.path.exists(parquet_path):
+        return False
+    mtime_ns, size = source_signature(path)
+    if meta.get("mtime_ns") == mtime_ns and meta.get("size") == size:
+        return True
+    # Cambió el mtime (p. ej. un checkout): solo reconstruir si cambió el contenido
+    if meta.get("size") == size and meta.get("sha256") == file_sha256(path):
+        _write_meta(meta_path, {**meta, "mtime_ns": mtime_ns})
+        return True
+    return False
+
+
+def load_superstore(path: str, use_cache: bool = True) -> pd.DataFrame:
+    """Devuelve el DataFrame Superstore, usando la caché Parquet si está vigente.
+
+    Si pyarrow no está instalado se lee directamente el CSV.
+    """
+    if not use_cache:
+        return read_superstore_csv(path)
+
+    parquet_path, meta_path = cache_paths(path)
+    try:
+        if _cache_is_fresh(path, parquet_path, meta_path):
+            return pd.read_parquet(parquet_path)
+    except ImportError:
+        return read_superstore_csv(path)
+
+    # La firma se toma antes de leer para no ocultar cambios concurrentes
+    mtime_ns, size = source_signature(path)
+    df = read_superstore_csv(path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp = parquet_path + ".tmp"
+    try:
+        df.to_parquet(tmp, index=False)
+    except ImportError:
+        return df
+    os.replace(tmp, parquet_path)
+    _write_meta(meta_path, {
+        "version": CACHE_VERSION,
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": file_sha256(path),
+    })
+    return df
@@ -0,0 +1,230 @@
+# ==============================================
+# Refresco incremental del cubo Superstore
+# ==============================================
+# El extracto solo crece: los pedidos nuevos se agregan al final del CSV.
+# En lugar de releer todo, se guarda en .cache el cubo diario (rollup, con
+# días de entrega como suma y conteo) y, en los metadatos del mismo Parquet,
+# el byte hasta donde se leyó y el último Row ID: un solo os.replace publica
+# ambos, así que un corte o dos procesos refrescando a la vez nunca dejan un
+# cubo con el offset de otra versión. Cada refresco:
+#
+#   1. comprueba que lo ya leído no cambió (hash del inicio y del final de
+#      la parte procesada); si cambió, reconstruye desde cero;
+#   2. parsea solo los bytes nuevos, hasta el último salto de línea completo
+#      (una línea a medio escribir se deja para el siguiente refresco);
+#   3. descarta filas con Row ID ya procesado, agrega el delta y lo suma al
+#      cubo guardado.
+#
+# Si el archivo termina sin salto de línea y lleva STABLE_S segundos sin
+# cambiar, esa última fila se suma al cubo devuelto pero no al guardado: se
+# vuelve a leer en cada refresco hasta que llegue su salto de línea.
+#
+# El costo depende del tamaño del delta y del cubo (dimensiones × fechas),
+# no del historial. Se asume que ningún campo contiene saltos de línea
+# (así es superstore_base.csv).
+#
+#   py Entrega1_MA/superstore_incremental.py Entrega1_MA/superstore_base.csv
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+from superstore_data import CACHE_DIR, CSV_OPTIONS, add_derived_columns, read_superstore_csv
+from superstore_cube import DIMENSIONS, MEASURES, RollupCube, rollup
+
+# Subir si cambia el formato del estado guardado
+STATE_VERSION = 2
+# Clave de los metadatos del Parquet con el estado del refresco
+STATE_KEY = b"superstore_incremental"
+# Segundos sin cambios para tomar el final del archivo como fin de línea
+STABLE_S = 1.0
+# Bytes que se hashean al inicio y al final de lo ya procesado
+PROBE_BYTES = 4096
+# Tamaño de cada bloque parseado (la memoria no depende del archivo)
+CHUNK_BYTES = 32 * 1024 * 1024
+
+
+class RefreshStats(NamedTuple):
+    mode: str        # "full", "delta" o "none"
+    rows: int        # filas nuevas agregadas
+    bytes: int       # bytes parseados
+
+
+def _sha(path: str, start: int, end: int) -> str:
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        return hashlib.sha256(fh.read(end - start)).hexdigest()
+
+
+def _complete_end(path: str, start: int, size: int) -> int:
+    """Posición justo después del último salto de línea en [start, size)."""
+    with open(path, "rb") as fh:
+        pos = size
+        while pos > start:
+            step = min(PROBE_BYTES, pos - start)
+            fh.seek(pos - step)
+            block = fh.read(step)
+            cut = block.rfind(b"\n")
+            if cut >= 0:
+                return pos - step + cut + 1
+            pos -= step
+    return start
+
+
+def _blocks(path: str, start: int, end: int, chunk_bytes: int = CHUNK_BYTES):
+    """Bloques de líneas completas entre start y end."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        rest = b""
+        remaining = end - start
+        while remaining > 0:
+            data = rest + fh.read(min(chunk_bytes, remaining))
+            remaining = end - fh.tell()
+            cut = data.rfind(b"\n") + 1 if remaining > 0 else len(data)
+            if cut:
+                yield data[:cut]
+            rest = data[cut:]
+        if rest:
+            yield rest
+
+
+def merge_rollups(parts) -> pd.DataFrame:
+    """Suma cubos con el mismo grano (las medias se rehacen con suma/conteo)."""
+    return (pd.concat(parts, ignore_index=True)
+              .groupby(DIMENSIONS, observed=True, sort=False)[MEASURES]
+              .sum()
+              .reset_index())
+
+
+class IncrementalRollup:
+    """Cubo diario persistido que se actualiza con las filas agregadas al CSV."""
+
+    def __init__(self, path: str):
+        self.path = path
+        folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+        base = os.path.splitext(os.path.basename(path))[0]
+        self.rollup_path = os.path.join(folder, base + ".rollup.parquet")
+        self.last_refresh = None
+
+    def _read_state(self):
+        try:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(self.rollup_path)
+            meta = json.loads((table.schema.metadata or {})[STATE_KEY])
+            if meta.get("version") != STATE_VERSION:
+                return None, None
+            offset = meta["offset"]
+            if os.path.getsize(self.path) < offset:
+                return None, None
+            head = min(PROBE_BYTES, offset)
+            if (_sha(self.path, 0, head) != meta["head_sha"]
+                    or _sha(self.path, max(0, offset - PROBE_BYTES), offset) != meta["tail_sha"]):
+                return None, None
+            return meta, table.to_pandas()
+        except (OSError, ValueError, KeyError, ImportError):
+            return None, None
+
+    def _write_state(self, daily: pd.DataFrame, meta: dict) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            # Sin pyarrow no se guarda el estado: el próximo refresco es completo
+            return
+        table = pa.Table.from_pandas(daily, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), STATE_KEY: json.dumps(meta).encode("utf-8")})
+        os.makedirs(os.path.dirname(self.rollup_path), exist_ok=True)
+        # Nombre propio por proceso e hilo: otro refresco concurrente no lo pisa
+        tmp = f"{self.rollup_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.rollup_path)
+
+    def _header(self):
+        with open(self.path, "rb") as fh:
+            first = fh.readline()
+        columns = pd.read_csv(io.BytesIO(first), nrows=0, **CSV_OPTIONS).columns.tolist()
+        return columns, len(first)
+
+    def refresh(self) -> RollupCube:
+        """Cubo al día; parsea solo lo agregado desde el último refresco."""
+        meta, daily = self._read_state()
+        size = os.path.getsize(self.path)
+        if meta is None:
+            columns, start = self._header()
+            meta = {"columns": columns, "last_row_id": 0}
+            daily, mode = None, "full"
+        else:
+            start, mode = meta["offset"], "delta"
+        end = _complete_end(self.path, start, size)
+        tail = self._tail_rollup(meta, end, size)
+        if daily is not None and end == start:
+            self.last_refresh = RefreshStats("none", 0, 0)
+            return RollupCube(daily if tail is None else merge_rollups([daily, tail]))
+
+        parts = [] if daily is None else [daily]
+        last_row_id, rows = meta["last_row_id"], 0
+        for block in _blocks(self.path, start, end):
+            # Mismo esquema compacto que la carga completa (superstore_schema.py)
+            df = read_superstore_csv(io.BytesIO(block), header=None, names=meta["columns"])
+            row_id = df["Row ID"]
+            # Filas repetidas de un refresco anterior
+            df = df[~(row_id <= meta["last_row_id"]).fillna(False)]
+            if df.empty:
+                continue
+            if row_id.notna().any():
+                last_row_id = max(last_row_id, int(row_id.max()))
+            rows += len(df)
+            parts.append(rollup(df))
+        if not parts:
+            parts = [rollup(add_derived_columns(pd.DataFrame(columns=meta["columns"])))]
+        daily = merge_rollups(parts) if len(parts) > 1 else parts[0]
+
+        self._write_state(daily, {
+            "version": STATE_VERSION,
+            "columns": meta["columns"],
+            "offset": end,
+            "last_row_id": last_row_id,
+            "head_sha": _sha(self.path, 0, min(PROBE_BYTES, end)),
+            "tail_sha": _sha(self.path, max(0, end - PROBE_BYTES), end),
+        })
+        self.last_refresh = RefreshStats(mode, rows, end - start)
+        return RollupCube(daily if tail is None else merge_rollups([daily, tail]))
+
+    def _tail_rollup(self, meta: dict, end: int, size: int):
+        """Cubo de la última línea sin salto de línea, si el archivo ya no cambia."""
+        if end >= size or time.time() - os.path.getmtime(self.path) < STABLE_S:
+            return None
+        with open(self.path, "rb") as fh:
+            fh.seek(end)
+            data = fh.read(size - end)
+        try:
+            df = read_superstore_csv(io.BytesIO(data), header=None, names=meta["columns"])
+            df = df[~(df["Row ID"] <= meta["last_row_id"]).fillna(False)]
+            return rollup(df) if not df.empty else None
+        except ValueError:
+            # Línea incompleta que no se puede parsear: se espera al siguiente refresco
+            return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresca el cubo Superstore guardado")
+    parser.add_argument("csv")
+    args = parser.parse_args(argv)
+
+    store = IncrementalRollup(args.csv)
+    cube = store.refresh()
+    stats = store.last_refresh
+    print(f"{stats.mode}: {stats.rows:,} filas nuevas ({stats.bytes:,} bytes); "
+          f"cubo de {len(cube.daily):,} filas")
+
+
+if __name__ == "__main__":
+    main()
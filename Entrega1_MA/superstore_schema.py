@@ -0,0 +1,109 @@
+# ==============================================
+# Esquema compacto del DataFrame Superstore
+# ==============================================
+# Tipos declarados por columna para que cada worker de Streamlit guarde en
+# memoria lo mínimo posible:
+#
+#   texto de baja cardinalidad   category (códigos enteros + un diccionario;
+#                                se crea al parsear, sin pasar por object)
+#   Order ID, Customer Name,     string[pyarrow] si pyarrow está instalado
+#   Product Name                 (un buffer contiguo en vez de un str por celda)
+#   enteros                      el ancho más chico que cubre el rango; nullable
+#                                porque el CSV trae filas con medidas vacías
+#   Discount                     float32 (viene con coma decimal: "0,2")
+#   Sales y Profit               float64: llegan a ~7e7 y float32 solo
+#                                representa enteros exactos hasta 1.6e7
+#
+# Reporte de memoria por columna (carga por defecto contra este esquema):
+#
+#   py Entrega1_MA/superstore_schema.py Entrega1_MA/superstore_base.csv
+import argparse
+
+import pandas as pd
+
+CATEGORY_COLUMNS = ["Ship Mode", "Segment", "Country", "City", "State", "Region",
+                    "Category", "Sub-Category", "Customer ID", "Product ID"]
+TEXT_COLUMNS = ["Order ID", "Customer Name", "Product Name"]
+INTEGER_COLUMNS = {"Row ID": "Int32", "Postal Code": "Int32", "Quantity": "Int8"}
+FLOAT_COLUMNS = {"Sales": "float64", "Profit": "float64", "Discount": "float32"}
+
+
+def text_dtype():
+    """string[pyarrow] si está pyarrow; si no, object como antes."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return object
+    return pd.StringDtype("pyarrow")
+
+
+def csv_dtypes() -> dict:
+    """dtype para pd.read_csv (las fechas se parsean después)."""
+    dtypes = {c: "category" for c in CATEGORY_COLUMNS}
+    dtypes.update({c: text_dtype() for c in TEXT_COLUMNS})
+    dtypes.update(INTEGER_COLUMNS)
+    dtypes.update(FLOAT_COLUMNS)
+    # Coma decimal: se lee como texto y se convierte en compact()
+    dtypes["Discount"] = object
+    return dtypes
+
+
+def _to_number(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return pd.to_numeric(s.astype(object).str.replace(",", ".", regex=False), errors="coerce")
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica el esquema a las columnas presentes (idempotente)."""
+    text = text_dtype()
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif col in TEXT_COLUMNS:
+            df[col] = df[col].astype(text)
+        elif col in INTEGER_COLUMNS:
+            df[col] = _to_number(df[col]).astype(INTEGER_COLUMNS[col])
+        elif col in FLOAT_COLUMNS:
+            df[col] = _to_number(df[col]).astype(FLOAT_COLUMNS[col])
+    return df
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Bytes por columna (deep) antes y después, con el total al final."""
+    report = pd.DataFrame({
+        "dtype antes": before.dtypes.astype(str),
+        "bytes antes": before.memory_usage(deep=True, index=False),
+        "dtype después": after.dtypes.astype(str),
+        "bytes después": after.memory_usage(deep=True, index=False),
+    })
+    total = pd.DataFrame({"dtype antes": [""], "bytes antes": [report["bytes antes"].sum()],
+                          "dtype después": [""], "bytes después": [report["bytes después"].sum()]},
+                         index=["TOTAL"])
+    report = pd.concat([report, total])
+    report["factor"] = report["bytes antes"] / report["bytes después"]
+    return report
+
+
+def print_memory_report(report: pd.DataFrame) -> None:
+    print(report.to_string(formatters={
+        "bytes antes": "{:,.0f}".format,
+        "bytes después": "{:,.0f}".format,
+        "factor": "{:.1f}x".format,
+    }))
+
+
+def main(argv=None):
+    from superstore_data import CSV_OPTIONS, add_derived_columns, read_superstore_csv
+
+    parser = argparse.ArgumentParser(description="Memoria por columna: carga por defecto vs esquema")
+    parser.add_argument("csv")
+    args = parser.parse_args(argv)
+
+    before = add_derived_columns(pd.read_csv(args.csv, **CSV_OPTIONS))
+    after = read_superstore_csv(args.csv)
+    print_memory_report(memory_report(before, after))
+
+
+if __name__ == "__main__":
+    main()
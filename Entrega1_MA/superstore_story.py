@@ -0,0 +1,161 @@
+# ==============================================
+# Núcleo de las historias Superstore (sin Streamlit)
+# ==============================================
+# Carga, resúmenes, melts y figuras de los slides. Las apps
+# (Entrega_storytelling.py, Storytelling.py) solo eligen qué mostrar y
+# dónde; el benchmark (bench_superstore.py) mide estas mismas funciones.
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from superstore_backend import StorySource, open_source
+from superstore_cube import category_summary, segment_summary, region_summary
+# Módulo compartido de la raíz del repo
+import repo_path  # noqa: F401
+from chart_prep import LINE_WIDTH_PX, downsample
+
+METRICS = ["Sales", "Profit"]
+
+
+def load_cube(path: str, backend: str = None) -> StorySource:
+    """Datos de las historias con el motor configurado (SUPERSTORE_BACKEND).
+
+    Con pandas es el RollupCube en memoria; con duckdb o polars, consultas
+    directas sobre el archivo.
+    """
+    return open_source(path, backend)
+
+
+def melt_metrics(summary: pd.DataFrame, id_var: str) -> pd.DataFrame:
+    """Sales y Profit en formato largo (Métrica, Valor) para barras agrupadas."""
+    return summary.melt(
+        id_vars=id_var,
+        value_vars=METRICS,
+        var_name="Métrica",
+        value_name="Valor"
+    )
+
+
+def delivery_trend(cube: StorySource, year=None, max_points: int = LINE_WIDTH_PX) -> pd.DataFrame:
+    """Días promedio de entrega por fecha, a lo sumo max_points puntos (LTTB)."""
+    return downsample(cube.delivery_trend(year), "Order Date", "Delivery Days", max_points)
+
+
+# ===========================
+# Figuras de Entrega_storytelling.py
+# ===========================
+def category_figure(cube: StorySource) -> go.Figure:
+    df_melt = melt_metrics(category_summary(cube), "Category")
+
+    fig1 = px.bar(
+        df_melt,
+        x="Category",
+        y="Valor",
+        color="Métrica",
+        barmode="group",
+        text="Valor",
+        title="Panorama de Ventas y Rentabilidad por Categoría"
+    )
+    fig1.update_traces(
+        texttemplate="%{text:.2s}",
+        textposition="outside",
+        marker=dict(line=dict(width=1, color="black"))
+    )
+    fig1.update_layout(
+        yaxis_title="Monto (USD)",
+        xaxis_title="Categoría",
+        uniformtext_minsize=10,
+        uniformtext_mode="hide",
+        legend_title_text="Métrica",
+        yaxis=dict(tickformat=".2s")
+    )
+    return fig1
+
+
+def segment_figure(cube: StorySource) -> go.Figure:
+    seg_summary = segment_summary(cube)
+
+    fig2 = make_subplots(
+        rows=1, cols=2,
+        specs=[[{"type": "domain"}, {"type": "domain"}]],
+        subplot_titles=("Ventas por Segmento", "Rentabilidad por Segmento")
+    )
+
+    fig_sales = px.pie(seg_summary, names="Segment", values="Sales")
+    for trace in fig_sales.data:
+        fig2.add_trace(trace, row=1, col=1)
+
+    fig_profit = px.pie(seg_summary, names="Segment", values="Profit")
+    for trace in fig_profit.data:
+        fig2.add_trace(trace, row=1, col=2)
+
+    fig2.update_layout(
+        title_text="Segmentación de Clientes",
+        width=1000,
+        height=500
+    )
+    return fig2
+
+
+def delivery_figure(cube: StorySource, selected_year) -> go.Figure:
+    fig_line = px.line(
+        delivery_trend(cube, selected_year),
+        x="Order Date",
+        y="Delivery Days",
+        title=f"Tiempo promedio de entrega ({selected_year})"
+    )
+    fig_line.update_traces(mode="lines+markers")
+    return fig_line
+
+
+def region_figure(cube: StorySource, selected_year) -> go.Figure:
+    df_melt = melt_metrics(region_summary(cube, selected_year), "Region")
+
+    fig_bar = px.bar(
+        df_melt,
+        x="Valor",
+        y="Region",
+        color="Métrica",
+        orientation="h",
+        barmode="group",
+        text="Valor",
+        title=f"Ventas y Rentabilidad por Región ({selected_year})"
+    )
+    fig_bar.update_traces(
+        texttemplate="%{text:.2s}",
+        textposition="outside",
+        marker=dict(line=dict(width=1, color="black"))
+    )
+    fig_bar.update_layout(
+        xaxis_title="Monto (USD)",
+        yaxis_title="Región",
+        uniformtext_minsize=10,
+        uniformtext_mode="hide",
+        legend_title_text="Métrica",
+        xaxis=dict(tickformat=".2s")
+    )
+    return fig_bar
+
+
+# ===========================
+# Slides
+# ===========================
+# Nombre del slide -> constructor; los de YEARLY_SLIDES reciben además el año
+# Subir este número cuando cambie cómo se construye alguna figura: invalida
+# las figuras guardadas por FigureCache (memoria y disco)
+FIGURE_VERSION = 1
+YEARLESS_SLIDES = {"categoria": category_figure, "segmento": segment_figure}
+YEARLY_SLIDES = {"entrega": delivery_figure, "region": region_figure}
+
+
+def slide_figure(slide: str, cube: StorySource, year=None) -> go.Figure:
+    if slide in YEARLY_SLIDES:
+        return YEARLY_SLIDES[slide](cube, year)
+    return YEARLESS_SLIDES[slide](cube)
+
+
+def figure_key(slide: str, year, data_version) -> tuple:
+    """Clave de FigureCache, la misma en la app y en warmup.py."""
+    return (FIGURE_VERSION, slide, None if slide in YEARLESS_SLIDES else year,
+            tuple(data_version))
@@ -0,0 +1,321 @@
+# ==============================================
+# Generador de datos Superstore sintéticos (pruebas de escala)
+# ==============================================
+# Produce archivos con las mismas 21 columnas que superstore_base.csv, desde
+# cientos de miles hasta cientos de millones de filas:
+#
+#   py Entrega1_MA/superstore_synth.py synth_1m.csv --rows 1000000
+#   py Entrega1_MA/superstore_synth.py synth_50m.parquet --rows 50000000 --seed 7
+#
+# - Ciudades, estados, regiones, segmentos, categorías y nombres se toman
+#   de superstore_base.csv, con sus frecuencias reales.
+# - Clientes y productos se amplían a la cardinalidad pedida y se eligen con
+#   sesgo tipo Zipf (pocos clientes/productos concentran muchas líneas).
+# - Fechas entre --start y --end con crecimiento anual y pico en
+#   septiembre, noviembre y diciembre; días de envío según el modo de
+#   envío, como en el archivo base.
+# - Todo se genera por bloques con numpy (sin bucles por fila) y cada
+#   bloque se escribe y se descarta: la memoria depende de --chunk-rows, no
+#   de --rows. Con la misma semilla el archivo es idéntico.
+#
+# En CSV se respeta el formato del original (";", latin1, fechas m/dd/aaaa y
+# Discount con coma decimal); Sales y Profit se escriben con punto decimal.
+# En Parquet las fechas y números van tipados.
+import argparse
+import math
+import os
+from typing import Iterator, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from superstore_data import CSV_OPTIONS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASE_FILE = os.path.join(HERE, "superstore_base.csv")
+COLUMNS = ["Row ID", "Order ID", "Order Date", "Ship Date", "Ship Mode", "Customer ID",
+           "Customer Name", "Segment", "Country", "City", "State", "Postal Code", "Region",
+           "Product ID", "Category", "Sub-Category", "Product Name", "Sales", "Quantity",
+           "Discount", "Profit"]
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_START = "2014-01-01"
+DEFAULT_END = "2017-12-31"
+# Exponente del sesgo Zipf de clientes y productos (0 = uniforme)
+DEFAULT_SKEW = 1.0
+# Crecimiento anual de pedidos y meses de temporada alta
+YEARLY_GROWTH = 0.2
+PEAK_MONTHS = {9: 1.6, 11: 1.8, 12: 1.8}
+# Precio unitario típico (mediana) por categoría, en USD
+UNIT_PRICE = {"Furniture": 120.0, "Office Supplies": 15.0, "Technology": 150.0}
+PRICE_SIGMA = 0.9
+MEAN_LINES_PER_ORDER = 2.0
+
+
+class Pools(NamedTuple):
+    """Valores de cada dimensión y pesos con los que se eligen."""
+    customers: pd.DataFrame      # Customer ID, Customer Name, Segment
+    customer_cdf: np.ndarray
+    products: pd.DataFrame       # Product ID, Category, Sub-Category, Product Name, Unit Price
+    product_cdf: np.ndarray
+    locations: pd.DataFrame      # City, State, Postal Code, Region
+    location_cdf: np.ndarray
+    ship_modes: np.ndarray
+    ship_mode_cdf: np.ndarray
+    ship_days: dict              # modo -> (días, cdf)
+    quantity: tuple              # (valores, cdf)
+    discount: dict               # región -> (valores, cdf)
+    day_cdf: np.ndarray
+    start: np.datetime64
+
+
+def _cdf(weights) -> np.ndarray:
+    cdf = np.cumsum(np.asarray(weights, dtype=float))
+    return cdf / cdf[-1]
+
+
+def _draw(rng: np.random.Generator, cdf: np.ndarray, size: int) -> np.ndarray:
+    """Índices con la distribución acumulada ``cdf`` (searchsorted, sin bucles)."""
+    return np.searchsorted(cdf, rng.random(size), side="right").clip(max=len(cdf) - 1)
+
+
+def _zipf_cdf(n: int, skew: float) -> np.ndarray:
+    return _cdf(1.0 / np.arange(1, n + 1) ** skew)
+
+
+def _empirical(values: pd.Series) -> tuple:
+    counts = values.value_counts(sort=False)
+    return counts.index.to_numpy(), _cdf(counts.to_numpy())
+
+
+def _expand(base: pd.DataFrame, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """``n`` filas: las de ``base`` y, si faltan, copias de filas al azar."""
+    if n <= len(base):
+        return base.iloc[rng.permutation(len(base))[:n]].reset_index(drop=True)
+    extra = base.iloc[rng.integers(0, len(base), n - len(base))]
+    return pd.concat([base, extra], ignore_index=True)
+
+
+def _synthetic_ids(prefixes: pd.Series, first: int, width: int) -> pd.Series:
+    numbers = pd.Series(np.arange(first, first + len(prefixes)), index=prefixes.index)
+    return prefixes + "-" + numbers.astype(str).str.zfill(width)
+
+
+def _day_weights(start: np.datetime64, end: np.datetime64) -> np.ndarray:
+    days = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="D")
+    t = np.arange(len(days)) / 365.25
+    season = days.month.map(lambda m: PEAK_MONTHS.get(m, 1.0)).to_numpy(dtype=float)
+    # Sin pedidos los domingos casi, como el original
+    weekday = np.where(days.dayofweek == 6, 0.3, 1.0)
+    return (1 + YEARLY_GROWTH) ** t * season * weekday
+
+
+def build_pools(base_path: str = BASE_FILE, customers: int = None, products: int = None,
+                start: str = DEFAULT_START, end: str = DEFAULT_END,
+                skew: float = DEFAULT_SKEW, seed: int = 0) -> Pools:
+    """Dimensiones a partir del archivo base, ampliadas a la cardinalidad pedida."""
+    rng = np.random.default_rng([seed, 0])
+    base = pd.read_csv(base_path, **CSV_OPTIONS, dtype=str)
+
+    cust = (base.dropna(subset=["Customer ID"]).drop_duplicates("Customer ID")
+                [["Customer ID", "Customer Name", "Segment"]])
+    cust = _expand(cust.reset_index(drop=True), customers or len(cust), rng)
+    extra = cust.index >= base["Customer ID"].nunique()
+    # IDs nuevos con las mismas iniciales: "CG-12520" -> "CG-100001"
+    cust.loc[extra, "Customer ID"] = _synthetic_ids(
+        cust.loc[extra, "Customer ID"].str.split("-").str[0], 100_000, 6)
+
+    prod = (base.dropna(subset=["Product ID"]).drop_duplicates("Product ID")
+                [["Product ID", "Category", "Sub-Category", "Product Name"]])
+    prod = _expand(prod.reset_index(drop=True), products or len(prod), rng)
+    extra = prod.index >= base["Product ID"].nunique()
+    # "FUR-BO-10001798" -> "FUR-BO-20000001"
+    prod.loc[extra, "Product ID"] = _synthetic_ids(
+        prod.loc[extra, "Product ID"].str.rsplit("-", n=1).str[0], 20_000_000, 8)
+    median = prod["Category"].map(UNIT_PRICE).fillna(50.0).to_numpy()
+    prod["Unit Price"] = np.round(median * rng.lognormal(0.0, PRICE_SIGMA, len(prod)), 2)
+
+    loc_counts = base.groupby(["City", "State", "Postal Code", "Region"]).size()
+    locations = loc_counts.index.to_frame(index=False)
+
+    ship_modes, ship_mode_cdf = _empirical(base["Ship Mode"])
+    days = (pd.to_datetime(base["Ship Date"], format="%m/%d/%Y")
+            - pd.to_datetime(base["Order Date"], format="%m/%d/%Y")).dt.days
+    ship_days = {mode: _empirical(days[base["Ship Mode"] == mode].dropna().astype(int))
+                 for mode in ship_modes}
+    quantity = _empirical(pd.to_numeric(base["Quantity"], errors="coerce").dropna().astype(int))
+    disc = pd.to_numeric(base["Discount"].str.replace(",", ".", regex=False), errors="coerce")
+    discount = {region: _empirical(disc[base["Region"] == region].dropna())
+                for region in base["Region"].dropna().unique()}
+
+    start_day, end_day = np.datetime64(start, "D"), np.datetime64(end, "D")
+    return Pools(
+        customers=cust, customer_cdf=_zipf_cdf(len(cust), skew),
+        products=prod, product_cdf=_zipf_cdf(len(prod), skew),
+        locations=locations, location_cdf=_cdf(loc_counts.to_numpy()),
+        ship_modes=ship_modes, ship_mode_cdf=ship_mode_cdf, ship_days=ship_days,
+        quantity=quantity, discount=discount,
+        day_cdf=_cdf(_day_weights(start_day, end_day)), start=start_day,
+    )
+
+
+def generate_chunk(pools: Pools, rng: np.random.Generator, rows: int,
+                   first_row: int, first_order: int) -> pd.DataFrame:
+    """``rows`` líneas de pedido; Row ID desde first_row y pedidos desde first_order."""
+    # Pedidos de 1..n líneas (geométrica) que comparten fecha, cliente y envío
+    n_orders = int(rows / MEAN_LINES_PER_ORDER * 1.2) + 16
+    sizes = rng.geometric(1 / MEAN_LINES_PER_ORDER, n_orders)
+    n_orders = int(np.searchsorted(np.cumsum(sizes), rows)) + 1
+    sizes = sizes[:n_orders]
+    sizes[-1] -= sizes.sum() - rows
+
+    day = _draw(rng, pools.day_cdf, n_orders)
+    order_date = pools.start + day.astype("timedelta64[D]")
+    mode_idx = _draw(rng, pools.ship_mode_cdf, n_orders)
+    ship_delay = np.zeros(n_orders, dtype=np.int64)
+    for i, mode in enumerate(pools.ship_modes):
+        sel = mode_idx == i
+        values, cdf = pools.ship_days[mode]
+        ship_delay[sel] = values[_draw(rng, cdf, int(sel.sum()))]
+    cust = _draw(rng, pools.customer_cdf, n_orders)
+    loc = _draw(rng, pools.location_cdf, n_orders)
+    years = order_date.astype("datetime64[Y]").astype(int) + 1970
+    prefix = np.where(rng.random(n_orders) < 0.8, "CA", "US")
+    order_id = (pd.Series(prefix) + "-" + pd.Series(years).astype(str) + "-"
+                + pd.Series(np.arange(first_order, first_order + n_orders) + 100_000).astype(str))
+
+    # Atributos de pedido repetidos por línea
+    def per_line(values):
+        return np.repeat(np.asarray(values), sizes)
+
+    customers = pools.customers.iloc[per_line(cust)].reset_index(drop=True)
+    locations = pools.locations.iloc[per_line(loc)].reset_index(drop=True)
+    products = pools.products.iloc[_draw(rng, pools.product_cdf, rows)].reset_index(drop=True)
+
+    q_values, q_cdf = pools.quantity
+    quantity = q_values[_draw(rng, q_cdf, rows)]
+    region = locations["Region"].to_numpy()
+    discount = np.zeros(rows)
+    for name, (values, cdf) in pools.discount.items():
+        sel = region == name
+        discount[sel] = values[_draw(rng, cdf, int(sel.sum()))]
+    sales = np.round(products["Unit Price"].to_numpy() * quantity * (1 - discount), 4)
+    # Margen base con ruido; los descuentos altos dejan pérdidas
+    margin = rng.normal(0.25, 0.12, rows) - 1.6 * discount
+    profit = np.round(sales * margin, 4)
+
+    ship_date = order_date + ship_delay.astype("timedelta64[D]")
+    return pd.DataFrame({
+        "Row ID": np.arange(first_row, first_row + rows),
+        "Order ID": per_line(order_id),
+        "Order Date": per_line(order_date).astype("datetime64[ns]"),
+        "Ship Date": per_line(ship_date).astype("datetime64[ns]"),
+        "Ship Mode": per_line(pools.ship_modes[mode_idx]),
+        "Customer ID": customers["Customer ID"],
+        "Customer Name": customers["Customer Name"],
+        "Segment": customers["Segment"],
+        "Country": "United States",
+        "City": locations["City"],
+        "State": locations["State"],
+        "Postal Code": locations["Postal Code"],
+        "Region": region,
+        "Product ID": products["Product ID"],
+        "Category": products["Category"],
+        "Sub-Category": products["Sub-Category"],
+        "Product Name": products["Product Name"],
+        "Sales": sales,
+        "Quantity": quantity,
+        "Discount": discount,
+        "Profit": profit,
+    }, columns=COLUMNS)
+
+
+def generate(rows: int, chunk_rows: int = DEFAULT_CHUNK_ROWS, seed: int = 0,
+             pools: Pools = None, **pool_options) -> Iterator[pd.DataFrame]:
+    """Bloques de a lo sumo chunk_rows filas hasta completar ``rows``."""
+    pools = pools or build_pools(seed=seed, **pool_options)
+    # Un generador independiente por bloque: reproducible sin depender del orden
+    seeds = np.random.SeedSequence([seed, 1]).spawn(math.ceil(rows / chunk_rows))
+    first_row, first_order = 1, 0
+    for chunk_seed in seeds:
+        n = min(chunk_rows, rows - first_row + 1)
+        chunk = generate_chunk(pools, np.random.default_rng(chunk_seed), n, first_row, first_order)
+        first_row += n
+        first_order += chunk["Order ID"].nunique()
+        yield chunk
+
+
+def _format_unique(values: np.ndarray, fmt) -> np.ndarray:
+    """Aplica ``fmt`` una vez por valor distinto (fechas, descuentos)."""
+    uniq, inverse = np.unique(values, return_inverse=True)
+    return np.array([fmt(v) for v in uniq], dtype=object)[inverse]
+
+
+def to_csv_format(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Mismo formato de texto que superstore_base.csv."""
+    out = chunk.copy()
+    for col in ("Order Date", "Ship Date"):
+        out[col] = _format_unique(chunk[col].to_numpy("datetime64[D]"),
+                                  lambda d: f"{pd.Timestamp(d).month}/{pd.Timestamp(d):%d/%Y}")
+    out["Discount"] = _format_unique(chunk["Discount"].to_numpy(),
+                                     lambda v: f"{v:g}".replace(".", ","))
+    return out
+
+
+def write_csv(chunks, path: str) -> int:
+    rows = 0
+    with open(path, "w", encoding=CSV_OPTIONS["encoding"], newline="") as fh:
+        for i, chunk in enumerate(chunks):
+            to_csv_format(chunk).to_csv(fh, sep=CSV_OPTIONS["sep"], index=False, header=i == 0)
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, path: str) -> int:
+    """Un row group por bloque, con ParquetWriter (no junta todo en memoria)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos Superstore sintéticos")
+    parser.add_argument("out", help="Archivo de salida (.csv o .parquet)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--customers", type=int,
+                        help="Clientes distintos (por defecto, ~1 cada 12 filas, máx. 2M)")
+    parser.add_argument("--products", type=int,
+                        help="Productos distintos (por defecto, ~1 cada 5 filas, máx. 1M)")
+    parser.add_argument("--start", default=DEFAULT_START)
+    parser.add_argument("--end", default=DEFAULT_END)
+    parser.add_argument("--skew", type=float, default=DEFAULT_SKEW)
+    parser.add_argument("--base", default=BASE_FILE)
+    parser.add_argument("--format", choices=["csv", "parquet"])
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    pools = build_pools(args.base,
+                        customers=args.customers or min(max(args.rows // 12, 1), 2_000_000),
+                        products=args.products or min(max(args.rows // 5, 1), 1_000_000),
+                        start=args.start, end=args.end, skew=args.skew, seed=args.seed)
+    chunks = generate(args.rows, args.chunk_rows, args.seed, pools=pools)
+    writer = write_parquet if fmt == "parquet" else write_csv
+    rows = writer(chunks, args.out)
+    print(f"{rows:,} filas -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# ======================================
+# Preparación de datos antes de codificar en Altair
+# ======================================
+# alt.Chart(df) incrusta todas las filas en el JSON que viaja al navegador,
+# que además vuelve a agregar. Aquí se agrupa, suma y agrupa en celdas
+# (binning) con pandas, para que cada gráfico lleve solo las filas que su
+# marca dibuja. Si aun así el spec supera CHART_MAX_SPEC_MB se recorta
+# (categorías menores en "Otros" o celdas más grandes) y se devuelve un aviso.
+#
+# Las series largas se reducen con LTTB (Largest-Triangle-Three-Buckets) o
+# min/max por tramo, a lo sumo un punto por píxel de ancho del gráfico.
+import os
+
+import numpy as np
+import pandas as pd
+
+MAX_SPEC_BYTES = int(float(os.environ.get("CHART_MAX_SPEC_MB", "5")) * 1024 * 1024)
+MAX_POINTS = 5000
+# Ancho típico (px) de un gráfico de línea: tope de puntos por traza
+LINE_WIDTH_PX = 600
+OTHERS_LABEL = "Otros"
+COUNT_COLUMN = "Registros"
+
+
+def estimate_json_bytes(df: pd.DataFrame, sample: int = 200) -> int:
+    """Tamaño aproximado de las filas serializadas como en el spec Vega-Lite."""
+    if df.empty:
+        return 0
+    head = df.head(sample)
+    per_row = len(head.to_json(orient="records", date_format="iso")) / len(head)
+    return int(per_row * len(df))
+
+
+def _numeric(s: pd.Series) -> pd.Series:
+    return s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
+
+
+def aggregate_by(df: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
+    """Una fila por valor de x con la suma de y (lo que dibuja una barra apilada)."""
+    if x == y:
+        return df[[x]]
+    return (_numeric(df[y]).groupby(df[x], sort=True).sum()
+                          .rename(y).reset_index())
+
+
+def limit_categories(df: pd.DataFrame, x: str, y: str, max_rows: int) -> pd.DataFrame:
+    """Conserva las max_rows - 1 categorías mayores y suma el resto en "Otros"."""
+    if len(df) <= max_rows:
+        return df
+    keep = df.nlargest(max_rows - 1, y)
+    rest = df.drop(keep.index)
+    others = pd.DataFrame({x: [OTHERS_LABEL], y: [rest[y].sum()]})
+    return pd.concat([keep.sort_index(), others], ignore_index=True)
+
+
+def bin_xy(df: pd.DataFrame, x: str, y: str, bins: int = 70) -> pd.DataFrame:
+    """Celdas x × y con el número de registros (centro de cada celda)."""
+    data = df[[x, y]].dropna()
+    if not all(pd.api.types.is_numeric_dtype(data[c]) for c in (x, y)):
+        return data.groupby([x, y], observed=True).size().reset_index(name=COUNT_COLUMN)
+    xb = pd.cut(data[x], bins, include_lowest=True)
+    yb = pd.cut(data[y], bins, include_lowest=True)
+    cells = data.groupby([xb, yb], observed=True).size().reset_index(name=COUNT_COLUMN)
+    cells[x] = cells[x].map(lambda iv: iv.mid).astype(float)
+    cells[y] = cells[y].map(lambda iv: iv.mid).astype(float)
+    return cells
+
+
+def prepare(df: pd.DataFrame, x: str, y: str, kind: str = "sum",
+            max_bytes: int = MAX_SPEC_BYTES, max_points: int = MAX_POINTS):
+    """Datos listos para alt.Chart y un aviso (o None) si hubo recorte.
+
+    kind="sum" para barras, sectores y líneas; kind="scatter" para
+    dispersión (en celdas con conteo si hay más de max_points filas).
+    """
+    note = None
+    if kind == "scatter":
+        data = df[[x, y]] if x != y else df[[x]]
+        if len(data) > max_points and x != y:
+            data = bin_xy(data, x, y)
+            note = f"{len(df):,} puntos agrupados en {len(data):,} celdas."
+    else:
+        data = aggregate_by(df, x, y)
+
+    size = estimate_json_bytes(data)
+    if size > max_bytes and x != y:
+        max_rows = max(2, int(len(data) * max_bytes / size))
+        if kind == "scatter":
+            data = bin_xy(df, x, y, bins=max(2, int(max_rows ** 0.5)))
+        else:
+            data = limit_categories(data, x, y, max_rows)
+        note = (f"El gráfico superaba {max_bytes / 1024 / 1024:.0f} MB; "
+                f"se muestran {len(data):,} filas resumidas.")
+    return data, note
+
+
+# ======================================
+# Reducción de series de tiempo
+# ======================================
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Índices elegidos por Largest-Triangle-Three-Buckets (x ordenado)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    every = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:nxt_end].mean()
+        avg_y = y[end:nxt_end].mean()
+        # Área del triángulo (punto anterior, candidato, promedio del tramo siguiente)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Mínimo y máximo de cada tramo, más el primer y último punto (<= n_out)."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    # Dos puntos por tramo y dos para los extremos de la serie
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1).astype(np.intp)
+    picks = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            picks += [lo + int(np.argmin(y[lo:hi])), lo + int(np.argmax(y[lo:hi]))]
+    return np.unique(picks)
+
+
+def _x_values(s: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.to_numpy("datetime64[ns]").astype(np.int64).astype(float)
+    if pd.api.types.is_numeric_dtype(s):
+        return s.to_numpy(dtype=float)
+    # Eje ordinal/texto: se usa la posición
+    return np.arange(len(s), dtype=float)
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: int = LINE_WIDTH_PX,
+               method: str = "lttb", keep_extremes: bool = True) -> pd.DataFrame:
+    """Filas de df (ordenado por x) reducidas a max_points para una línea.
+
+    method: "lttb" o "minmax". Con keep_extremes se conservan siempre el
+    mínimo y el máximo global, donde suelen ir las anotaciones. El
+    resultado nunca pasa de max_points filas.
+    """
+    if len(df) <= max_points or x == y:
+        return df
+    data = df.dropna(subset=[y])
+    yv = _numeric(data[y]).to_numpy(dtype=float)
+    # Se reservan dos puntos para el mínimo y el máximo global
+    budget = max_points - 2 if keep_extremes else max_points
+    if method == "minmax":
+        idx = minmax_indices(yv, budget)
+    else:
+        idx = lttb_indices(_x_values(data[x]), yv, budget)
+    extremes = np.array([], dtype=np.intp)
+    if keep_extremes and len(yv):
+        extremes = np.unique([int(np.nanargmin(yv)), int(np.nanargmax(yv))])[:max_points]
+        idx = np.union1d(idx, extremes)
+    if len(idx) > max_points:
+        # Topes muy chicos (los métodos devuelven todo): puntos equiespaciados
+        # más los extremos
+        rest = np.setdiff1d(idx, extremes)
+        take = max(max_points - len(extremes), 0)
+        idx = np.union1d(rest[np.linspace(0, len(rest) - 1, take).astype(np.intp)], extremes)
+    return data.iloc[idx]
@@ -0,0 +1,129 @@
+# ======================================
+# Lectura rápida de Excel
+# ======================================
+# pd.read_excel con openpyxl construye el modelo completo de celdas. Aquí
+# se leen las filas por streaming (openpyxl read_only) o con calamine
+# (python-calamine, en Rust) si está instalado, eligiendo la hoja y
+# proyectando solo las columnas que necesita la historia.
+import importlib.util
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def calamine_available() -> bool:
+    return importlib.util.find_spec("python_calamine") is not None
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def column_filter(usecols):
+    """usecols (lista de nombres o función) -> función nombre -> bool."""
+    if usecols is None:
+        return lambda name: True
+    if callable(usecols):
+        return usecols
+    wanted = set(usecols)
+    return lambda name: name in wanted
+
+
+def sheet_names(source) -> list:
+    """Nombres de las hojas sin cargar las celdas."""
+    _rewind(source)
+    if calamine_available():
+        from python_calamine import CalamineWorkbook
+        names = CalamineWorkbook.from_object(source).sheet_names
+    else:
+        import openpyxl
+        wb = openpyxl.load_workbook(source, read_only=True)
+        names = wb.sheetnames
+        wb.close()
+    _rewind(source)
+    return list(names)
+
+
+def _calamine_rows(source, sheet_name):
+    from python_calamine import CalamineWorkbook
+
+    wb = CalamineWorkbook.from_object(source)
+    if isinstance(sheet_name, int):
+        sheet = wb.get_sheet_by_index(sheet_name)
+    else:
+        sheet = wb.get_sheet_by_name(sheet_name)
+    yield from sheet.iter_rows()
+
+
+def _openpyxl_rows(source, sheet_name):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_excel_chunks(source, sheet_name=0, usecols=None, chunksize: int = DEFAULT_CHUNKSIZE,
+                      engine: str = "auto"):
+    """DataFrames de hasta ``chunksize`` filas, solo con las columnas pedidas.
+
+    engine: "auto" (calamine si está instalado), "calamine" u "openpyxl".
+    """
+    if engine == "auto":
+        engine = "calamine" if calamine_available() else "openpyxl"
+    _rewind(source)
+    rows = iter(_calamine_rows(source, sheet_name) if engine == "calamine"
+                else _openpyxl_rows(source, sheet_name))
+
+    header = next(rows, None)
+    if header is None:
+        return
+    keep = column_filter(usecols)
+    header = [c if c not in (None, "") else f"Unnamed: {i}" for i, c in enumerate(header)]
+    idx = [i for i, c in enumerate(header) if keep(c)]
+    columns = [header[i] for i in idx]
+    width = len(header)
+
+    batch = []
+    for row in rows:
+        row = tuple(row[:width]) + (None,) * (width - len(row))
+        batch.append([row[i] for i in idx])
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=columns)
+
+
+def concat_chunks(chunks: list) -> pd.DataFrame:
+    """Une los bloques con los tipos que daría leer todo el archivo de una vez.
+
+    Una columna vacía en todo un bloque llega como object y, al unirla con los
+    bloques numéricos o de fechas, la columna entera quedaría object. Esas
+    columnas se vuelven a inferir sobre el resultado.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    frame = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    mixed = [c for c in frame.columns
+             if frame[c].dtype == object and any(ch[c].dtype != object for ch in chunks)]
+    if mixed:
+        frame[mixed] = frame[mixed].infer_objects()
+    return frame
+
+
+def read_excel(source, sheet_name=0, usecols=None, engine: str = "auto") -> pd.DataFrame:
+    """Equivalente a pd.read_excel por la vía rápida (.xls usa pandas)."""
+    name = str(getattr(source, "name", source)).lower()
+    if name.endswith(".xls"):
+        return pd.read_excel(source, sheet_name=sheet_name,
+                             usecols=None if usecols is None else column_filter(usecols))
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            return read_excel(fh, sheet_name, usecols, engine)
+    return concat_chunks(list(iter_excel_chunks(source, sheet_name, usecols, engine=engine)))
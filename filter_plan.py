@@ -0,0 +1,59 @@
+# ======================================
+# Plan de filtros perezoso para los dashboards
+# ======================================
+# Los filtros de la barra lateral se combinan en una sola máscara booleana:
+# no se copia el DataFrame por cada filtro. Al final solo se materializan
+# las filas del Top N, elegidas con selección parcial (nlargest, O(n log k))
+# en lugar de ordenar todo.
+import numpy as np
+import pandas as pd
+
+
+class FilterPlan:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._mask = None
+
+    def _and(self, cond) -> "FilterPlan":
+        cond = np.asarray(cond, dtype=bool)
+        self._mask = cond if self._mask is None else (self._mask & cond)
+        return self
+
+    def isin(self, column: str, values) -> "FilterPlan":
+        return self._and(self.df[column].isin(values))
+
+    def between(self, column: str, start, end) -> "FilterPlan":
+        col = self.df[column]
+        return self._and((col >= start) & (col <= end))
+
+    def column(self, column: str) -> pd.Series:
+        """Una sola columna con los filtros aplicados (no copia el resto)."""
+        col = self.df[column]
+        return col if self._mask is None else col[self._mask]
+
+    def frame(self) -> pd.DataFrame:
+        return self.df if self._mask is None else self.df[self._mask]
+
+    def top_n(self, by: str, n: int) -> pd.DataFrame:
+        """Las n filas con mayor ``by``, de mayor a menor (vacíos al final).
+
+        nlargest solo admite números (no bool ni object) y descarta los
+        vacíos; para lo demás se ordena como antes.
+        """
+        values = self.column(by)
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            index = values.nlargest(n).index
+            if len(index) < n:
+                # Completa con los vacíos, como sort_values(na_position="last")
+                index = index.append(values.index[values.isna()][:n - len(index)])
+        else:
+            index = values.sort_values(ascending=False, na_position="last").head(n).index
+        return self.df.loc[index]
+
+
+def extremes(df: pd.DataFrame, column: str):
+    """(fila mínima, fila máxima) de df según column, calculadas juntas."""
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+    if not len(values) or np.isnan(values).all():
+        return None, None
+    return df.iloc[int(np.nanargmin(values))], df.iloc[int(np.nanargmax(values))]
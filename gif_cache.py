@@ -0,0 +1,191 @@
+# ======================================
+# Animaciones GIF en caché y fuera del hilo de Streamlit
+# ======================================
+# El GIF se identifica por el hash de los datos de la serie y el estilo.
+# Se codifica una sola vez en un proceso aparte (la app sigue dibujando
+# mientras tanto) y los bytes se guardan en memoria y en .cache/gif, con
+# expiración por edad y un tope de tamaño total. No quedan archivos
+# temporales sueltos en /tmp.
+import atexit
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "gif")
+MAX_CACHE_MB = 64
+MAX_AGE_S = 7 * 24 * 3600
+MEMORY_ITEMS = 16
+# Subir si cambia el dibujo para invalidar los GIF guardados
+RENDER_VERSION = 1
+
+
+def _remove(path):
+    # Otra sesión pudo haberlo borrado ya
+    with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+def animation_key(**spec) -> str:
+    payload = json.dumps({"v": RENDER_VERSION, **spec}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_line_gif(values, labels, fmt="r-o", y_margin=50, interval=200) -> bytes:
+    """Dibuja la línea punto a punto y devuelve el GIF (se ejecuta en el worker)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    fig, ax = plt.subplots()
+    line, = ax.plot([], [], fmt)
+    ax.set_xlim(0, len(labels) - 1)
+    ax.set_ylim(0, max(values) + y_margin)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+
+    def init():
+        line.set_data([], [])
+        return line,
+
+    def update(frame):
+        line.set_data(range(frame + 1), values[:frame + 1])
+        return line,
+
+    ani = animation.FuncAnimation(fig, update, frames=len(values), init_func=init,
+                                  blit=True, interval=interval)
+    # Directorio temporal que se borra al salir del with
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "animacion.gif")
+        ani.save(path, writer="pillow")
+        plt.close(fig)
+        with open(path, "rb") as fh:
+            return fh.read()
+
+
+class AnimationCache:
+    """GIFs por clave en memoria (LRU pequeña) y en disco (edad + tamaño)."""
+
+    def __init__(self, folder: str = CACHE_DIR, max_mb: int = MAX_CACHE_MB,
+                 max_age_s: int = MAX_AGE_S, memory_items: int = MEMORY_ITEMS):
+        self.folder = folder
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_s = max_age_s
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.folder, key + ".gif")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_s:
+                _remove(path)
+                return None
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data: bytes) -> None:
+        self._remember(key, data)
+        path = self._path(key)
+        # Temporal propio de cada proceso/hilo: dos workers que generan la
+        # misma clave no escriben sobre el mismo archivo
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            _remove(tmp)
+            raise
+        self.evict()
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def evict(self) -> None:
+        """Borra los GIF vencidos y, si hace falta, los más antiguos hasta caber."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(".gif"):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            if now - info.st_mtime > self.max_age_s:
+                _remove(path)
+            else:
+                entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+class GifRenderer:
+    """Codifica GIFs en un proceso aparte y los sirve desde la caché."""
+
+    def __init__(self, cache: AnimationCache = None, max_workers: int = 1):
+        self.cache = cache or AnimationCache()
+        # "spawn": no se hereda el estado de los hilos del servidor
+        self._pool = ProcessPoolExecutor(max_workers=max_workers,
+                                         mp_context=multiprocessing.get_context("spawn"))
+        self._pending = {}
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def line_gif(self, values, labels, **style) -> Future:
+        """Future con los bytes del GIF; ya resuelto si estaba en caché."""
+        values, labels = list(values), list(labels)
+        key = animation_key(kind="line", values=values, labels=labels, style=style)
+        data = self.cache.get(key)
+        if data is not None:
+            done = Future()
+            done.set_result(data)
+            return done
+        with self._lock:
+            # Si otra sesión ya lo pidió, se comparte el mismo trabajo
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pool.submit(render_line_gif, values, labels, **style)
+            self._pending[key] = future
+        # Fuera del lock: si ya terminó, el callback corre en este mismo hilo
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,58 @@
+# ======================================
+# Importaciones perezosas para las apps de Streamlit
+# ======================================
+# lazy_import("plotly.express") devuelve un módulo vacío que importa el real
+# al usar el primer atributo, es decir, cuando la sección que lo necesita se
+# dibuja. Con LAZY_IMPORTS=0 se importa de inmediato (útil para ver errores
+# de dependencias al arrancar).
+#
+# No se usa importlib.util.LazyLoader: find_spec("plotly.express") ya
+# importa el paquete padre (plotly), y antes de Python 3.12 LazyLoader no es
+# seguro entre hilos (Streamlit corre cada sesión en su propio hilo). El
+# import real va por importlib.import_module bajo un candado del módulo.
+import importlib
+import importlib.util
+import os
+import threading
+import types
+
+LAZY = os.environ.get("LAZY_IMPORTS", "1") != "0"
+
+# Reentrante: importar un módulo puede tocar otro módulo perezoso
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Módulo ``name`` que se importa en el primer acceso a un atributo."""
+
+    def _load(self):
+        module = self.__dict__.get("_lazy_target")
+        if module is None:
+            with _lock:
+                module = self.__dict__.get("_lazy_target")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr):
+        # Solo se llama con atributos que el marcador no tiene
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str):
+    """Módulo ``name`` cargado en el primer acceso a uno de sus atributos."""
+    import sys
+
+    if name in sys.modules:
+        return sys.modules[name]
+    if not LAZY:
+        return importlib.import_module(name)
+    # Falla de inmediato si no existe el paquete raíz (sin importarlo)
+    root = name.partition(".")[0]
+    if importlib.util.find_spec(root) is None:
+        raise ModuleNotFoundError(f"No module named {root!r}", name=root)
+    return LazyModule(name)
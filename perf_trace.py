@@ -0,0 +1,250 @@
+# ======================================
+# Tiempos por etapa de cada rerun de las apps
+# ======================================
+# Cada app abre una corrida al inicio del script (begin_run) y mide sus
+# pasos con `stage` (bloque with) o `timed` (decorador). Etapas:
+#
+#   carga           lectura de archivos / cachés (read_csv, read_excel, índices)
+#   transformacion  fechas, filtros, reglas del flujo PQR
+#   agregado        groupby, sumas, resúmenes
+#   consulta        búsquedas puntuales (FAQ, radicados)
+#   figura          construcción de figuras
+#   serializacion   spec/JSON que se envía al navegador, codificación de GIF
+#   persistencia    escrituras (interacciones, radicados)
+#
+# Al cerrar la corrida (end_run) se agrega una línea JSON a
+# .cache/trace.jsonl; `py perf_trace.py` resume p50/p95 por app y etapa.
+# PERF_TRACE=0 desactiva la medición (stage y timed no hacen nada). El panel
+# de la barra lateral aparece con PERF_PANEL=1 o con ?debug=1 en la URL.
+#
+#   py perf_trace.py                       # todas las apps
+#   py perf_trace.py --app chatbot --last 500
+import argparse
+import contextlib
+import contextvars
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import NamedTuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("PERF_TRACE", "1") != "0"
+PANEL = os.environ.get("PERF_PANEL", "0") == "1"
+TRACE_FILE = os.environ.get("PERF_TRACE_FILE", os.path.join(ROOT, ".cache", "trace.jsonl"))
+STAGES = ("carga", "transformacion", "agregado", "consulta", "figura",
+          "serializacion", "persistencia")
+# Corridas recientes de este proceso (para el panel, sin leer el archivo)
+RECENT_RUNS = 200
+
+
+class Span(NamedTuple):
+    stage: str
+    name: str
+    ms: float
+
+
+class RunTrace:
+    """Pasos medidos durante un rerun de una app."""
+
+    def __init__(self, app: str):
+        self.app = app
+        self.started = time.time()
+        self.spans = []
+        self.total_ms = None
+        self._t0 = time.perf_counter()
+
+    def add(self, stage: str, name: str, ms: float) -> None:
+        self.spans.append(Span(stage, name, ms))
+
+    def elapsed_ms(self) -> float:
+        if self.total_ms is not None:
+            return self.total_ms
+        return (time.perf_counter() - self._t0) * 1000
+
+    def finish(self) -> None:
+        if self.total_ms is None:
+            self.total_ms = self.elapsed_ms()
+
+    def to_record(self) -> dict:
+        return {
+            "app": self.app,
+            "ts": round(self.started, 3),
+            "total_ms": round(self.elapsed_ms(), 3),
+            "spans": [{"stage": s.stage, "name": s.name, "ms": round(s.ms, 3)}
+                      for s in self.spans],
+        }
+
+
+# Cada sesión de Streamlit ejecuta su script en su propio hilo
+_current = contextvars.ContextVar("perf_trace_run", default=None)
+_recent = deque(maxlen=RECENT_RUNS)
+_lock = threading.Lock()
+
+
+def begin_run(app: str):
+    """Abre la corrida de este rerun (cierra la anterior si quedó abierta).
+
+    Un st.rerun() o st.stop() corta el script antes de end_run; esa corrida
+    se registra aquí, al empezar la siguiente en el mismo hilo.
+    """
+    if not ENABLED:
+        return None
+    end_run()
+    run = RunTrace(app)
+    _current.set(run)
+    return run
+
+
+def current_run():
+    return _current.get()
+
+
+def end_run(path: str = TRACE_FILE):
+    """Cierra la corrida actual y la agrega al archivo de trazas."""
+    run = _current.get()
+    if run is None or run.total_ms is not None:
+        return run
+    run.finish()
+    record = run.to_record()
+    with _lock:
+        _recent.append(record)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            # La traza nunca debe tumbar la app
+            pass
+    return run
+
+
+@contextlib.contextmanager
+def stage(stage: str, name: str = ""):
+    """Mide el bloque y lo registra en la corrida actual (si la hay)."""
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add(stage, name, (time.perf_counter() - t0) * 1000)
+
+
+def timed(stage_name: str, name: str = None):
+    """Decorador: mide cada llamada de la función como un paso de ``stage_name``."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ------------------------------
+# Resúmenes p50/p95
+# ------------------------------
+def percentile(values, q: float) -> float:
+    """Percentil por rango más cercano (q entre 0 y 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(records) -> list:
+    """Filas (app, etapa, paso, n, p50, p95) ordenadas por p95 descendente.
+
+    El paso "(total)" es el tiempo completo del rerun.
+    """
+    samples = defaultdict(list)
+    for record in records:
+        samples[(record["app"], "(total)", "")].append(record["total_ms"])
+        # Un mismo paso puede repetirse en un rerun: se suma
+        per_run = defaultdict(float)
+        for span in record["spans"]:
+            per_run[(record["app"], span["stage"], span["name"])] += span["ms"]
+        for key, ms in per_run.items():
+            samples[key].append(ms)
+    rows = [{"app": app, "etapa": stage_name, "paso": name, "n": len(values),
+             "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95)}
+            for (app, stage_name, name), values in samples.items()]
+    return sorted(rows, key=lambda r: (r["app"], -r["p95_ms"]))
+
+
+def read_trace(path: str = TRACE_FILE, app: str = None, last: int = None) -> list:
+    records = deque(maxlen=last)
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Línea cortada por un proceso que terminó a mitad de escritura
+                    continue
+                if app is None or record.get("app") == app:
+                    records.append(record)
+    except OSError:
+        pass
+    return list(records)
+
+
+# ------------------------------
+# Panel de depuración (Streamlit)
+# ------------------------------
+def panel_enabled() -> bool:
+    import streamlit as st
+
+    return PANEL or st.query_params.get("debug") == "1"
+
+
+def debug_panel(run=None) -> None:
+    """Tiempos del rerun y p50/p95 de las corridas recientes, en la barra lateral."""
+    run = run or _current.get()
+    if run is None or not panel_enabled():
+        return
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Tiempos por etapa", expanded=True):
+        st.caption(f"{run.app}: {run.elapsed_ms():.1f} ms este rerun")
+        st.dataframe([{"etapa": s.stage, "paso": s.name, "ms": round(s.ms, 2)}
+                      for s in run.spans], hide_index=True, use_container_width=True)
+        with _lock:
+            recent = [r for r in _recent if r["app"] == run.app]
+        if recent:
+            st.caption(f"Últimos {len(recent)} reruns de este proceso")
+            st.dataframe([{k: (round(v, 2) if isinstance(v, float) else v)
+                           for k, v in row.items() if k != "app"}
+                          for row in summarize(recent)],
+                         hide_index=True, use_container_width=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="p50/p95 por app y etapa desde la traza JSONL")
+    parser.add_argument("trace", nargs="?", default=TRACE_FILE)
+    parser.add_argument("--app")
+    parser.add_argument("--last", type=int, help="Solo las últimas N corridas")
+    args = parser.parse_args(argv)
+
+    records = read_trace(args.trace, args.app, args.last)
+    if not records:
+        print(f"Sin corridas en {args.trace}")
+        return
+    print(f"{len(records)} corridas")
+    print(f"{'app':24s} {'etapa':15s} {'paso':24s} {'n':>6s} {'p50 ms':>10s} {'p95 ms':>10s}")
+    for row in summarize(records):
+        print(f"{row['app']:24s} {row['etapa']:15s} {row['paso']:24s} {row['n']:6d} "
+              f"{row['p50_ms']:10.2f} {row['p95_ms']:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
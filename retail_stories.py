@@ -0,0 +1,81 @@
+# ======================================
+# Historias PyNarrative de Ejemplo_4 (ventas y clientes por año)
+# ======================================
+# Las dos historias se renderizan una vez por versión del Excel y se guardan
+# como spec Vega-Lite (JSON) en .cache/stories. La app las dibuja con
+# st.vega_lite_chart; warmup.py las deja listas al arrancar el servidor.
+import json
+import os
+
+import pandas as pd
+
+from excel_loader import read_excel
+
+STORY_COLUMNS = ["Year", "Sales", "Customers"]
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "stories")
+# Subir si cambia el diseño de las historias
+STORY_VERSION = 1
+
+
+def load_retail(path: str) -> pd.DataFrame:
+    """Solo las columnas que usan las historias, leídas por la vía rápida."""
+    df = read_excel(path, usecols=STORY_COLUMNS)
+    if not set(STORY_COLUMNS).issubset(df.columns):
+        raise ValueError(f"El archivo debe contener estas columnas: {set(STORY_COLUMNS)}")
+    return df
+
+
+def sales_story(df: pd.DataFrame):
+    import pynarrative as pn
+
+    return (
+        pn.Story(df, width=600, height=400)
+          .mark_line(color="steelblue", point=True)
+          .encode(x="Year:O", y="Sales:Q")
+          .add_title("Evolución de Ventas", "2018-2022", title_color="#2c3e50")
+          .add_context("Las ventas cayeron en 2020 (pandemia)", position="top", color="red")
+          .add_annotation(2020, df.loc[df["Year"] == 2020, "Sales"].values[0],
+                          "Impacto COVID-19", arrow_direction="left", arrow_color="red")
+          .add_context("Recuperación fuerte en 2021-2022", position="bottom", color="green")
+          .add_source("Fuente: Datos reales de Retail")
+          .render()
+    )
+
+
+def customers_story(df: pd.DataFrame):
+    import pynarrative as pn
+
+    return (
+        pn.Story(df, width=600, height=400)
+          .mark_bar(color="orange")
+          .encode(x="Year:O", y="Customers:Q")
+          .add_title("Número de Clientes", "2018-2022", title_color="#8e44ad")
+          .add_context("Caída de clientes en 2020", position="top", color="red")
+          .add_annotation(2020, df.loc[df["Year"] == 2020, "Customers"].values[0],
+                          "Clientes afectados", arrow_direction="up", arrow_color="red")
+          .add_context("Crecimiento acelerado en 2021-2022", position="bottom", color="green")
+          .add_source("Fuente: Datos reales de CRM")
+          .render()
+    )
+
+
+def story_specs(path: str) -> dict:
+    """{"ventas": spec, "clientes": spec} desde la caché o renderizados ahora."""
+    info = os.stat(path)
+    base = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(
+        CACHE_DIR, f"{base}-{STORY_VERSION}-{info.st_mtime_ns}-{info.st_size}.json")
+    try:
+        with open(cache_path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        pass
+
+    df = load_retail(path)
+    specs = {"ventas": sales_story(df).to_dict(), "clientes": customers_story(df).to_dict()}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(specs, fh)
+    os.replace(tmp, cache_path)
+    return specs
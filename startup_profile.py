@@ -0,0 +1,159 @@
+# ======================================
+# Perfil de importaciones al arrancar cada app
+# ======================================
+# Ejecuta cada punto de entrada en un proceso nuevo con
+# ``python -X importtime`` y resume la salida: tiempo total, las
+# importaciones directas más caras y los módulos con más tiempo propio.
+#
+# Por defecto solo corre las importaciones de nivel superior (incluidas las
+# asignaciones ``x = lazy_import(...)``), sin leer datos ni dibujar: mide lo
+# que cuesta importar el script, no el primer render. Un módulo perezoso que
+# el script usa al dibujar no aparece, así que la diferencia contra --eager
+# es la ganancia máxima. Con --render el script se ejecuta completo una vez
+# (streamlit.testing AppTest) y se cuenta todo lo que importa ese primer
+# render, perezoso o no.
+#
+#   py startup_profile.py                      # todas las apps
+#   py startup_profile.py Entrega1_MA/Chatbot.py --top 5
+#   py startup_profile.py --eager              # igual, con LAZY_IMPORTS=0
+#   py startup_profile.py --render             # primer render completo
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS = [
+    "Ejemplo_1_Storytelling.py",
+    "Ejemplo_4_Storytelling.py",
+    "Ejemplo_5_Storytelling.py",
+    "Ejemplo_6_Storytelling.py",
+    "Ejemplo_7_Storytelling.py",
+    "Ejemplo_8_Storytelling.py",
+    "Ejmplo1_data_fija.py",
+    "storytelling_app.py",
+    os.path.join("Entrega1_MA", "Chatbot.py"),
+    os.path.join("Entrega1_MA", "Analitica_chatbot.py"),
+    os.path.join("Entrega1_MA", "Entrega_storytelling.py"),
+    os.path.join("Entrega1_MA", "Storytelling.py"),
+]
+# Separa lo que importa el intérprete al iniciar (site, encodings...) de lo
+# que importa el script
+MARKER = "startup_profile: script"
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class StartupProfile(NamedTuple):
+    script: str
+    wall_s: float
+    imports: list
+    error: str
+
+
+def import_statements(path: str) -> str:
+    """Código con solo las importaciones de nivel superior del script."""
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    keep = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            keep.append(node)
+        elif (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+              and getattr(node.value.func, "id", None) == "lazy_import"):
+            keep.append(node)
+    code = "\n".join(ast.unparse(node) for node in keep)
+    return f"import sys\nsys.stderr.write({MARKER!r} + '\\n')\n{code}"
+
+
+def render_code(path: str) -> str:
+    """Código que ejecuta el script completo una vez (primer render).
+
+    Streamlit y su arnés de pruebas se importan antes de la marca; lo que se
+    cuenta es lo que importa el script al dibujarse.
+    """
+    return (
+        "import sys\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({path!r}, default_timeout=300)\n"
+        f"sys.stderr.write({MARKER!r} + '\\n')\n"
+        "at.run()\n"
+        "if at.exception:\n"
+        "    sys.exit(at.exception[0].message)\n"
+    )
+
+
+def parse_importtime(stderr: str) -> list:
+    """Filas de ``-X importtime`` (la profundidad sale de la sangría)."""
+    rows = []
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile_script(script: str, eager: bool = False, render: bool = False) -> StartupProfile:
+    path = os.path.join(ROOT, script)
+    env = dict(os.environ)
+    # Igual que `py -m streamlit run <script>` desde la raíz del repo
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (ROOT, os.path.dirname(path), env.get("PYTHONPATH")) if p)
+    env["LAZY_IMPORTS"] = "0" if eager else "1"
+    start = time.perf_counter()
+    code = render_code(path) if render else import_statements(path)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    error = ""
+    if proc.returncode:
+        error = proc.stderr.strip().splitlines()[-1]
+    return StartupProfile(script, wall, parse_importtime(proc.stderr), error)
+
+
+def print_profile(profile: StartupProfile, top: int = 10) -> None:
+    direct = [r for r in profile.imports if r.depth == 0]
+    total_ms = sum(r.cumulative_us for r in direct) / 1000
+    print(f"\n{profile.script}: {total_ms:,.0f} ms en imports "
+          f"({len(profile.imports)} módulos, {profile.wall_s:.2f} s de proceso)")
+    if profile.error:
+        print(f"  ! {profile.error}")
+    print("  Más caros (acumulado):")
+    for r in sorted(direct, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"    {r.cumulative_us / 1000:9.1f} ms  {r.module}")
+    print("  Más tiempo propio:")
+    for r in sorted(profile.imports, key=lambda r: r.self_us, reverse=True)[:top]:
+        print(f"    {r.self_us / 1000:9.1f} ms  {r.module}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación al arrancar cada app")
+    parser.add_argument("scripts", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--eager", action="store_true",
+                        help="Desactiva las importaciones perezosas (LAZY_IMPORTS=0)")
+    parser.add_argument("--render", action="store_true",
+                        help="Ejecuta el script completo (primer render), no solo los imports")
+    args = parser.parse_args(argv)
+
+    for script in args.scripts:
+        print_profile(profile_script(script, eager=args.eager, render=args.render),
+                      top=args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,29 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-import tempfile, os
+
+import perf_trace
+from gif_cache import GifRenderer
+from lazy_imports import lazy_import
+from perf_trace import stage
+
+# Las librerías de gráficos se cargan al dibujar la sección que las usa
+px = lazy_import("plotly.express")
+sns = lazy_import("seaborn")
+plt = lazy_import("matplotlib.pyplot")
 
 st.set_page_config(page_title="📊 Storytelling Demo", layout="wide")
+perf_trace.begin_run("storytelling_app")
+
+# El GIF de la sección 3 se pide primero: si no está en caché se codifica en
+# otro proceso mientras se dibujan las secciones 1 y 2
+@st.cache_resource
+def gif_renderer():
+    return GifRenderer()
+
+ventas = [100, 150, 180, 220, 260]
+meses = ["Ene", "Feb", "Mar", "Abr", "May"]
+video = gif_renderer().line_gif(ventas, meses, fmt="r-o")
 
 # ======================
 # 1. Dashboard interactivo con Plotly
@@ -23,8 +39,10 @@ df = pd.DataFrame({
     "Ventas": [120, 150, 180, 130, 200]
 })
 
-fig = px.line(df, x="Mes", y="Ventas", title="Evolución de Ventas", markers=True)
-st.plotly_chart(fig, use_container_width=True)
+with stage("figura", "plotly"):
+    fig = px.line(df, x="Mes", y="Ventas", title="Evolución de Ventas", markers=True)
+with stage("serializacion", "plotly"):
+    st.plotly_chart(fig, use_container_width=True)
 
 # ======================
 # 2. Infografía narrativa con Seaborn
@@ -33,11 +51,13 @@ st.header("🖼️ Infografía Narrativa")
 
 data = {"Segmento": ["Jóvenes", "Adultos", "Mayores"],
         "Compras": [300, 500, 200]}
-sns.set(style="whitegrid")
-fig2, ax = plt.subplots()
-sns.barplot(x=data["Segmento"], y=data["Compras"], ax=ax, palette="viridis")
-ax.set_title("Compras por Segmento")
-st.pyplot(fig2)
+with stage("figura", "seaborn"):
+    sns.set(style="whitegrid")
+    fig2, ax = plt.subplots()
+    sns.barplot(x=data["Segmento"], y=data["Compras"], ax=ax, palette="viridis")
+    ax.set_title("Compras por Segmento")
+with stage("serializacion", "seaborn"):
+    st.pyplot(fig2)
 
 # ======================
 # 3.1 Video corto con Matplotlib Animation
@@ -45,37 +65,20 @@ st.pyplot(fig2)
 
 st.header("🎥 Video Corto con Insights")
 
-ventas = [100, 150, 180, 220, 260]
-meses = ["Ene", "Feb", "Mar", "Abr", "May"]
-
-# Crear figura
-fig3, ax3 = plt.subplots()
-line, = ax3.plot([], [], 'r-o')
-ax3.set_xlim(0, len(meses)-1)
-ax3.set_ylim(0, max(ventas)+50)
-ax3.set_xticks(range(len(meses)))
-ax3.set_xticklabels(meses)
-
-# Funciones de animación
-def init():
-    line.set_data([], [])
-    return line,
-
-def update(frame):
-    line.set_data(range(frame+1), ventas[:frame+1])
-    return line,
-
-ani = animation.FuncAnimation(fig3, update, frames=len(ventas), init_func=init, blit=True)
-
-# Guardar animación como GIF temporal (usando Pillow en lugar de ffmpeg)
-tmpfile = tempfile.NamedTemporaryFile(delete=False, suffix='.gif')
-ani.save(tmpfile.name, writer="pillow")
-
-# Mostrar en Streamlit
-st.image(tmpfile.name)
+# Animación (matplotlib + Pillow) codificada en gif_cache.py; se muestran
+# los bytes desde la caché, sin archivos temporales
+# La espera cuenta como serialización: es la codificación del GIF
+with stage("serializacion", "gif"):
+    if not video.done():
+        with st.spinner("Generando animación..."):
+            video.result()
+    st.image(video.result())
 
 # ======================
 # Footer
 # ======================
 st.markdown("---")
 st.markdown("✅ Demo de Storytelling en Marketing Analytics con Python + Streamlit")
+
+perf_trace.end_run()
+perf_trace.debug_panel()
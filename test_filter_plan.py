@@ -0,0 +1,49 @@
+# ======================================
+# Pruebas del plan de filtros (Top N)
+# ======================================
+#   py -m pytest test_filter_plan.py
+import numpy as np
+import pandas as pd
+
+from filter_plan import FilterPlan
+
+
+def baseline_top_n(df, by, n):
+    """Selección original de los dashboards: ordenar todo y tomar n."""
+    return df.sort_values(by, ascending=False).head(n)
+
+
+def test_top_n_bool_column():
+    df = pd.DataFrame({"x": list("abcdef"), "activo": [True, False, True, False, False, True]})
+    top = FilterPlan(df).top_n("activo", 4)
+    assert top["activo"].tolist() == baseline_top_n(df, "activo", 4)["activo"].tolist()
+    assert top["activo"].sum() == 3
+
+
+def test_top_n_keeps_nan_rows():
+    df = pd.DataFrame({"x": list("abcde"), "y": [3.0, np.nan, 1.0, np.nan, 2.0]})
+    top = FilterPlan(df).top_n("y", 5)
+    expected = baseline_top_n(df, "y", 5)
+    assert len(top) == len(expected) == 5
+    assert top["y"].head(3).tolist() == [3.0, 2.0, 1.0]
+    assert top["y"].tail(2).isna().all()
+    assert set(top["x"]) == set(expected["x"])
+
+
+def test_top_n_nan_not_needed():
+    df = pd.DataFrame({"x": list("abcd"), "y": [np.nan, 5.0, 1.0, 4.0]})
+    assert FilterPlan(df).top_n("y", 2)["x"].tolist() == ["b", "d"]
+
+
+def test_top_n_object_column_with_mask():
+    df = pd.DataFrame({"x": list("abcd"), "g": ["u", "v", "u", "v"], "y": ["b", "d", "a", "c"]})
+    top = FilterPlan(df).isin("g", ["u"]).top_n("y", 5)
+    assert top["x"].tolist() == ["a", "c"]
+
+
+def test_top_n_nullable_dtypes():
+    df = pd.DataFrame({"b": pd.array([True, None, False, True], dtype="boolean"),
+                       "i": pd.array([2, None, 7, 1], dtype="Int64")})
+    assert FilterPlan(df).top_n("b", 4)["b"].head(2).tolist() == [True, True]
+    top = FilterPlan(df).top_n("i", 4)["i"]
+    assert top.head(3).tolist() == [7, 2, 1] and top.isna().iloc[-1]
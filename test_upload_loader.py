@@ -0,0 +1,58 @@
+# ======================================
+# Pruebas de la lectura por bloques (upload_loader / excel_loader)
+# ======================================
+#   py -m pytest test_upload_loader.py
+import datetime
+
+import pandas as pd
+import pytest
+
+from excel_loader import concat_chunks, iter_excel_chunks
+from upload_loader import ingest
+
+CHUNKSIZE = 3
+
+
+@pytest.fixture
+def xlsx_blank_chunk(tmp_path):
+    """Excel cuyas columnas Ventas y Fecha vienen vacías en todo el primer bloque."""
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Producto", "Ventas", "Fecha"])
+    for i in range(CHUNKSIZE):
+        ws.append([f"p{i}", None, None])
+    for i in range(CHUNKSIZE, 2 * CHUNKSIZE + 1):
+        ws.append([f"p{i}", i * 1.5, datetime.datetime(2024, 1, i)])
+    path = tmp_path / "blank_chunk.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_blank_chunk_is_object(xlsx_blank_chunk):
+    # Precondición: el bloque vacío por sí solo no tiene tipo
+    with open(xlsx_blank_chunk, "rb") as fh:
+        first = next(iter_excel_chunks(fh, chunksize=CHUNKSIZE, engine="openpyxl"))
+    assert first["Ventas"].dtype == object
+
+
+def test_ingest_matches_read_excel_dtypes(xlsx_blank_chunk):
+    expected = pd.read_excel(xlsx_blank_chunk)
+    with open(xlsx_blank_chunk, "rb") as fh:
+        result = ingest(fh, name="blank_chunk.xlsx", chunksize=CHUNKSIZE)
+    assert pd.api.types.is_float_dtype(result.frame["Ventas"])
+    assert pd.api.types.is_datetime64_any_dtype(result.frame["Fecha"])
+    assert result.frame["Ventas"].dtype == expected["Ventas"].dtype
+    assert result.frame["Ventas"].sum() == expected["Ventas"].sum()
+    assert len(result.frame) == len(expected)
+
+
+def test_concat_chunks_matches_pandas_dtypes(xlsx_blank_chunk):
+    with open(xlsx_blank_chunk, "rb") as fh:
+        chunks = list(iter_excel_chunks(fh, chunksize=CHUNKSIZE, engine="openpyxl"))
+    assert len(chunks) > 1
+    got = concat_chunks(chunks)
+    expected = pd.read_excel(xlsx_blank_chunk)
+    assert pd.api.types.is_float_dtype(got["Ventas"])
+    assert pd.api.types.is_datetime64_any_dtype(got["Fecha"])
+    assert got["Ventas"].dtype == expected["Ventas"].dtype
@@ -0,0 +1,208 @@
+# ======================================
+# Carga por bloques (chunks) de archivos subidos
+# ======================================
+# Los dashboards solo muestran df.head() y unos pocos agregados, así que no
+# hace falta tener todo el archivo en memoria: se lee en bloques, la vista
+# previa sale del primer bloque y los agregados se acumulan bloque a bloque.
+# Si se piden las filas completas, se respeta un techo de memoria
+# configurable (UPLOAD_MEMORY_LIMIT_MB, 256 MB por defecto).
+#
+# cached_ingest guarda el resultado por hash del contenido + opciones de
+# lectura, para no volver a parsear el mismo archivo en cada rerun.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from excel_loader import DEFAULT_CHUNKSIZE, column_filter, concat_chunks, iter_excel_chunks
+DEFAULT_MEMORY_LIMIT_MB = int(os.environ.get("UPLOAD_MEMORY_LIMIT_MB", "256"))
+DEFAULT_CACHE_MB = int(os.environ.get("UPLOAD_CACHE_MB", "512"))
+
+
+class MemoryLimitExceeded(Exception):
+    """El archivo no cabe en el techo de memoria configurado."""
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def iter_chunks(source, name: str = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                sheet_name=0, usecols=None, **read_options):
+    """DataFrames de hasta ``chunksize`` filas para un CSV o Excel subido.
+
+    ``usecols`` (lista o función) proyecta columnas; las que no existan se ignoran.
+    """
+    name = (name or getattr(source, "name", "")).lower()
+    if usecols is not None:
+        usecols = column_filter(usecols)
+    _rewind(source)
+    if name.endswith(".csv"):
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=usecols, **read_options)
+    elif name.endswith(".xls"):
+        # El formato binario antiguo no se puede leer por streaming
+        yield pd.read_excel(source, sheet_name=sheet_name, usecols=usecols, **read_options)
+    else:
+        yield from iter_excel_chunks(source, sheet_name, usecols, chunksize)
+
+
+class IncrementalAggregate:
+    """Suma y conteo por grupo, fusionando los parciales de cada bloque."""
+
+    def __init__(self, by, values):
+        self.by = [by] if isinstance(by, str) else list(by)
+        self.values = list(values)
+        self._acc = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        values = [c for c in self.values if c in chunk.columns]
+        part = chunk.groupby(self.by)[values].agg(["sum", "count"])
+        if self._acc is None:
+            self._acc = part
+        else:
+            self._acc = pd.concat([self._acc, part]).groupby(level=self.by).sum()
+
+    def sums(self) -> Optional[pd.DataFrame]:
+        if self._acc is None:
+            return None
+        sums = self._acc.xs("sum", axis=1, level=1)
+        return sums.sort_index().reset_index()
+
+    def counts(self) -> Optional[pd.DataFrame]:
+        if self._acc is None:
+            return None
+        return self._acc.xs("count", axis=1, level=1).sort_index().reset_index()
+
+
+class IngestResult(NamedTuple):
+    columns: list
+    preview: pd.DataFrame
+    rows: int
+    # Filas completas (solo si keep_rows=True)
+    frame: Optional[pd.DataFrame]
+    # Sumas por grupo (solo si se pidió group_by y la columna existe)
+    aggregates: Optional[pd.DataFrame]
+
+
+def ingest(source, name: str = None, group_by=None, values=(), keep_rows: bool = True,
+           chunksize: int = DEFAULT_CHUNKSIZE, memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+           on_preview=None, **read_options) -> IngestResult:
+    """Lee ``source`` por bloques.
+
+    ``on_preview(head)`` se llama con el primer bloque antes de seguir
+    leyendo. Con ``keep_rows`` se conservan las filas mientras no se supere
+    ``memory_limit_mb``; si se supera se lanza MemoryLimitExceeded.
+    """
+    limit = memory_limit_mb * 1024 * 1024
+    columns, preview, parts, used, rows = [], None, [], 0, 0
+    agg = None
+    for chunk in iter_chunks(source, name, chunksize, **read_options):
+        if preview is None:
+            columns, preview = chunk.columns.tolist(), chunk.head()
+            if on_preview:
+                on_preview(preview)
+            keys = [group_by] if isinstance(group_by, str) else list(group_by or [])
+            if keys and set(keys).issubset(columns):
+                agg = IncrementalAggregate(keys, values)
+        if agg is not None:
+            agg.update(chunk)
+        if keep_rows:
+            used += int(chunk.memory_usage(deep=True).sum())
+            if used > limit:
+                raise MemoryLimitExceeded(
+                    f"El archivo supera el límite de {memory_limit_mb} MB en memoria "
+                    f"(leídas {rows + len(chunk):,} filas).")
+            parts.append(chunk)
+        rows += len(chunk)
+
+    if preview is None:
+        preview = pd.DataFrame()
+    frame = None
+    if keep_rows:
+        frame = concat_chunks(parts) if parts else preview
+    return IngestResult(columns, preview, rows, frame, agg.sums() if agg is not None else None)
+
+
+# ======================================
+# Caché de archivos ya parseados
+# ======================================
+def content_hash(source, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 del contenido de un archivo subido (o abierto en binario)."""
+    if hasattr(source, "getvalue"):
+        return hashlib.sha256(source.getvalue()).hexdigest()
+    digest = hashlib.sha256()
+    _rewind(source)
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        digest.update(chunk)
+    _rewind(source)
+    return digest.hexdigest()
+
+
+def _result_nbytes(result: IngestResult) -> int:
+    frames = (result.preview, result.frame, result.aggregates)
+    return sum(int(f.memory_usage(deep=True).sum()) for f in frames if f is not None)
+
+
+class ParseCache:
+    """LRU por bytes, compartida por todas las sesiones del proceso.
+
+    Los DataFrames devueltos son compartidos: no modificarlos in-place.
+    """
+
+    def __init__(self, max_mb: int = DEFAULT_CACHE_MB):
+        self.max_bytes = max_mb * 1024 * 1024
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, result: IngestResult) -> None:
+        size = _result_nbytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            self._items[key] = (result, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self.nbytes -= old_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+PARSE_CACHE = ParseCache()
+
+
+def cached_ingest(source, name: str = None, on_preview=None, cache: ParseCache = None,
+                  **options) -> IngestResult:
+    """ingest() con caché por hash del contenido y opciones de lectura."""
+    cache = PARSE_CACHE if cache is None else cache
+    name = name or getattr(source, "name", "")
+    key = (content_hash(source), os.path.splitext(name)[1].lower(),
+           tuple(sorted((k, repr(v)) for k, v in options.items())))
+    result = cache.get(key)
+    if result is None:
+        result = ingest(source, name, on_preview=on_preview, **options)
+        cache.put(key, result)
+    elif on_preview:
+        on_preview(result.preview)
+    return result
@@ -0,0 +1,172 @@
+# ======================================
+# Calentamiento de cachés al arrancar el servidor
+# ======================================
+# Hace en un pool de procesos el trabajo que, si no, paga el primer usuario
+# de cada app, y lo deja en las cachés de disco que las apps ya leen:
+#
+#   superstore   cubo Superstore (.cache de Entrega1_MA) y luego, en
+#                paralelo por año, todas las figuras de los slides
+#                (figure_cache, .cache/figures)
+#   faq          índice TF-IDF del Chatbot (.cache/faq_index)
+#   retail       historias PyNarrative de Ejemplo_4 (.cache/stories)
+#
+# El estado queda en .cache/warmup.json ("running", "ready" o "failed" por
+# trabajo); sirve de bandera de disponibilidad para un healthcheck:
+#
+#   py warmup.py & py -m streamlit run Entrega1_MA/Entrega_storytelling.py
+#   py warmup.py --status        # código de salida 0 solo si todo está listo
+#
+# Ejecutar desde la raíz del repo (las apps usan rutas relativas a ella).
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTREGA_DIR = os.path.join(ROOT, "Entrega1_MA")
+# Los módulos de Entrega1_MA se importan como lo hace Streamlit con sus scripts
+sys.path.insert(0, ENTREGA_DIR)
+
+STATUS_FILE = os.path.join(ROOT, ".cache", "warmup.json")
+SUPERSTORE_FILE = "Entrega1_MA/superstore_base.csv"
+RETAIL_FILE = "data_retail.xlsx"
+
+
+# ------------------------------
+# Trabajos (se ejecutan en los procesos del pool)
+# ------------------------------
+def warm_superstore() -> list:
+    """Carga/refresca el cubo y devuelve los años para las figuras."""
+    from superstore_story import load_cube
+
+    return load_cube(SUPERSTORE_FILE).years()
+
+
+def warm_slides(year=None) -> int:
+    """Figuras de un año (o las que no dependen del año) en la caché de disco."""
+    from figure_cache import FIGURE_DIR, FigureCache
+    from superstore_data import source_signature
+    from superstore_story import (YEARLESS_SLIDES, YEARLY_SLIDES, figure_key, load_cube,
+                                  slide_figure)
+
+    cube = load_cube(SUPERSTORE_FILE)
+    data_version = source_signature(SUPERSTORE_FILE)
+    cache = FigureCache(folder=FIGURE_DIR)
+    slides = YEARLY_SLIDES if year is not None else YEARLESS_SLIDES
+    for slide in slides:
+        cache.get_or_build(figure_key(slide, year, data_version),
+                           lambda: slide_figure(slide, cube, year))
+    return len(slides)
+
+
+def warm_faq() -> int:
+    from faq_index import FAQ_FILE, INDEX_DIR, FaqIndex
+
+    return len(FaqIndex.load_or_build(FAQ_FILE, INDEX_DIR))
+
+
+def warm_retail() -> int:
+    from retail_stories import story_specs
+
+    return len(story_specs(RETAIL_FILE))
+
+
+JOBS = {"superstore": warm_superstore, "faq": warm_faq, "retail": warm_retail}
+
+
+# ------------------------------
+# Bandera de disponibilidad
+# ------------------------------
+def read_status(path: str = STATUS_FILE) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_ready(path: str = STATUS_FILE) -> bool:
+    """True cuando el último calentamiento terminó sin errores."""
+    return read_status(path).get("state") == "ready"
+
+
+def _write_status(status: dict, path: str = STATUS_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(status, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def run_warmup(jobs=tuple(JOBS), max_workers: int = None) -> dict:
+    """Ejecuta los trabajos en paralelo; actualiza el estado al terminar cada uno."""
+    status = {"state": "running", "started": time.time(), "jobs": {}}
+    for name in jobs:
+        status["jobs"][name] = {"state": "running"}
+    _write_status(status)
+
+    def finish(name, future, t0):
+        entry = {"seconds": round(time.perf_counter() - t0, 3)}
+        try:
+            entry.update(state="ready", result=future.result())
+        except Exception:
+            entry.update(state="failed", error=traceback.format_exc(limit=3))
+        status["jobs"][name] = entry
+        _write_status(status)
+        return entry
+
+    # "spawn": procesos limpios, igual en Windows y Linux
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = {pool.submit(JOBS[name]): (name, time.perf_counter()) for name in jobs}
+        while pending:
+            for future in as_completed(list(pending)):
+                name, t0 = pending.pop(future)
+                entry = finish(name, future, t0)
+                # Con el cubo listo, las figuras se reparten por año
+                if name == "superstore" and entry["state"] == "ready":
+                    for year in [None] + list(entry["result"]):
+                        slide_job = f"slides:{year or 'todos'}"
+                        status["jobs"][slide_job] = {"state": "running"}
+                        pending[pool.submit(warm_slides, year)] = (slide_job, time.perf_counter())
+                    _write_status(status)
+                    break
+
+    failed = [n for n, e in status["jobs"].items() if e["state"] == "failed"]
+    status.update(state="failed" if failed else "ready", finished=time.time())
+    _write_status(status)
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calienta las cachés de las apps")
+    parser.add_argument("jobs", nargs="*", default=list(JOBS),
+                        help=f"Trabajos a ejecutar (por defecto todos: {', '.join(JOBS)})")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--status", action="store_true",
+                        help="Muestra el estado del último calentamiento y sale")
+    args = parser.parse_args(argv)
+    unknown = set(args.jobs) - set(JOBS)
+    if unknown:
+        parser.error(f"trabajos desconocidos: {', '.join(sorted(unknown))}")
+
+    if args.status:
+        status = read_status()
+        print(json.dumps(status, indent=2, ensure_ascii=False) if status else "sin calentar")
+        sys.exit(0 if is_ready() else 1)
+
+    os.chdir(ROOT)
+    status = run_warmup(args.jobs, args.workers)
+    for name, entry in status["jobs"].items():
+        print(f"{name:14s} {entry['state']:7s} {entry.get('seconds', 0):7.2f}s")
+        if entry["state"] == "failed":
+            print(entry["error"])
+    sys.exit(0 if status["state"] == "ready" else 1)
+
+
+if __name__ == "__main__":
+    main()